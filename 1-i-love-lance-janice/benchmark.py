@@ -0,0 +1,81 @@
+"""Throughput benchmark for the Lance & Janet decoders.
+
+Compares the per-character `solution` against the chunked, table-driven
+`decode_stream` on generated ciphertext of increasing size.
+
+Usage:
+
+    python benchmark.py [--sizes 1 100 1024] [--per-char-limit 100]
+
+Sizes are given in megabytes. The per-character path is skipped above
+`--per-char-limit` megabytes since it runs at roughly a microsecond per
+byte.
+"""
+import argparse
+import random
+import string
+import time
+
+from solution import CHUNK_SIZE, decode_stream, solution
+
+MB = 1 << 20
+
+
+def random_block(chunk_size=CHUNK_SIZE, seed=0):
+    """Generates one chunk of mixed-case ciphertext."""
+    rng = random.Random(seed)
+    alphabet = string.ascii_lowercase * 4 + string.ascii_uppercase + " .,!?'"
+    return ''.join(rng.choice(alphabet) for _ in range(chunk_size))
+
+
+def generate_chunks(block, size):
+    """Yields `size` bytes of ciphertext by repeating `block`.
+
+    Repeating a single block keeps the cost of building the input next to
+    nothing compared to decoding it.
+    """
+    remaining = size
+    while remaining > 0:
+        yield block[:remaining]
+        remaining -= len(block)
+
+
+def per_char(chunks):
+    for chunk in chunks:
+        solution(chunk)
+
+
+def streaming(chunks):
+    for _ in decode_stream(chunks):
+        pass
+
+
+def measure(decoder, block, size):
+    start = time.time()
+    decoder(generate_chunks(block, size))
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 1024])
+    parser.add_argument('--per-char-limit', type=int, default=100)
+    args = parser.parse_args()
+
+    print('%10s %18s %18s %10s' % ('size (MB)', 'per-char (MB/s)',
+                                   'streaming (MB/s)', 'speedup'))
+    block = random_block()
+    for size_mb in args.sizes:
+        size = size_mb * MB
+        fast = measure(streaming, block, size)
+        if size_mb <= args.per_char_limit:
+            slow = measure(per_char, block, size)
+            print('%10d %18.2f %18.2f %9.1fx' % (
+                size_mb, size_mb / slow, size_mb / fast, slow / fast))
+        else:
+            print('%10d %18s %18.2f %10s' % (
+                size_mb, 'skipped', size_mb / fast, '-'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Bulk decoder for directories of Lance & Janet ciphertext files.
+
+Every input file is memory-mapped and cut into ranges of at most
+`SPLIT_SIZE` bytes. The cipher maps each byte independently, so the
+ranges are decrypted by a process pool in any order and written into a
+pre-sized, memory-mapped output file at the same offset.
+
+This is not zero-copy: `str.translate` needs a string, so each worker
+copies its range out of the input map and back into the output map
+`CHUNK_SIZE` bytes at a time. Only a couple of chunks are ever held in
+memory per worker, however large the range.
+
+Usage:
+
+    python bulk.py SOURCE_DIR DEST_DIR [--processes N] [--split-size MB]
+"""
+import argparse
+import mmap
+import os
+import time
+from multiprocessing import Pool, cpu_count
+
+from solution import ATBASH_TABLE, CHUNK_SIZE
+
+MB = 1 << 20
+
+# Largest range of a single file handed to one worker.
+SPLIT_SIZE = 64 * MB
+
+
+def split(size, split_size=SPLIT_SIZE):
+    """Cuts `size` bytes into consecutive `(offset, length)` ranges.
+
+    Args:
+        size (int): The number of bytes to cover.
+        split_size (int, optional): The longest range. Defaults to SPLIT_SIZE.
+
+    Returns:
+        List[Tuple[int, int]]: The ranges, in order.
+
+    Examples:
+
+    >>> split(10, 4)
+    [(0, 4), (4, 4), (8, 2)]
+    >>> split(0, 4)
+    []
+    """
+    return [(offset, min(split_size, size - offset))
+            for offset in range(0, size, split_size)]
+
+
+def decode_range(job):
+    """Decrypts one range of `source` into the same range of `destination`.
+
+    Copies at most `CHUNK_SIZE` bytes at a time, so a worker's memory stays
+    flat however long the range.
+
+    Args:
+        job (Tuple[str, str, int, int]): The source path, destination path,
+            offset and length of the range.
+
+    Returns:
+        int: The number of bytes decrypted.
+    """
+    source, destination, offset, length = job
+    with open(source, 'rb') as src, open(destination, 'r+b') as dst:
+        src_map = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+        dst_map = mmap.mmap(dst.fileno(), 0, access=mmap.ACCESS_WRITE)
+        try:
+            for start in range(offset, offset + length, CHUNK_SIZE):
+                end = min(start + CHUNK_SIZE, offset + length)
+                dst_map[start:end] = src_map[start:end].translate(ATBASH_TABLE)
+        finally:
+            dst_map.close()
+            src_map.close()
+    return length
+
+
+def plan(source_dir, dest_dir, split_size=SPLIT_SIZE):
+    """Pre-sizes every output file and lists the ranges left to decrypt.
+
+    Args:
+        source_dir (str): The directory of ciphertext files.
+        dest_dir (str): The directory to write decrypted files to.
+        split_size (int, optional): The longest range. Defaults to SPLIT_SIZE.
+
+    Returns:
+        Tuple[int, List[Tuple[str, str, int, int]]]: The number of files
+            found and the jobs for `decode_range`.
+    """
+    if not os.path.isdir(dest_dir):
+        os.makedirs(dest_dir)
+
+    num_files = 0
+    jobs = []
+    for name in sorted(os.listdir(source_dir)):
+        source = os.path.join(source_dir, name)
+        if not os.path.isfile(source):
+            continue
+        destination = os.path.join(dest_dir, name)
+        size = os.path.getsize(source)
+        with open(destination, 'wb') as dst:
+            dst.truncate(size)
+        num_files += 1
+        jobs.extend((source, destination, offset, length)
+                    for offset, length in split(size, split_size))
+    return num_files, jobs
+
+
+def bulk_decode(source_dir, dest_dir, processes=None, split_size=SPLIT_SIZE):
+    """Decrypts every file in `source_dir` into `dest_dir`.
+
+    Args:
+        source_dir (str): The directory of ciphertext files.
+        dest_dir (str): The directory to write decrypted files to. Files
+            keep their names.
+        processes (int, optional): The size of the process pool. Defaults
+            to the number of CPUs.
+        split_size (int, optional): The longest range handed to one
+            worker. Defaults to SPLIT_SIZE.
+
+    Returns:
+        Tuple[int, int, float]: The number of files, the number of bytes
+            and the wall time in seconds.
+    """
+    start = time.time()
+    num_files, jobs = plan(source_dir, dest_dir, split_size)
+
+    pool = Pool(processes or cpu_count())
+    try:
+        # Large ranges first so a straggler does not hold up the tail.
+        jobs.sort(key=lambda job: job[3], reverse=True)
+        num_bytes = sum(pool.imap_unordered(decode_range, jobs))
+    finally:
+        pool.close()
+        pool.join()
+
+    return num_files, num_bytes, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source_dir')
+    parser.add_argument('dest_dir')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--split-size', type=int, default=SPLIT_SIZE // MB,
+                        help='largest range per worker, in megabytes')
+    args = parser.parse_args()
+
+    num_files, num_bytes, elapsed = bulk_decode(
+        args.source_dir, args.dest_dir, args.processes, args.split_size * MB)
+    elapsed = max(elapsed, 1e-9)
+    print('%d files, %.1f MB in %.2fs: %.1f files/s, %.1f MB/s' % (
+        num_files, float(num_bytes) / MB, elapsed,
+        num_files / elapsed, num_bytes / elapsed / MB))
+
+
+if __name__ == '__main__':
+    main()
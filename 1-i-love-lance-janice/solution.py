@@ -1,4 +1,12 @@
 import re
+from string import ascii_lowercase, maketrans
+
+# Byte-for-byte lookup table for the cipher. Every byte that is not a
+# lowercase ASCII letter maps to itself.
+ATBASH_TABLE = maketrans(ascii_lowercase, ascii_lowercase[::-1])
+
+# Number of bytes read per step when decrypting a file-like object.
+CHUNK_SIZE = 1 << 16
 
 def solution(msg):
     """Decrypts encrypted message.
@@ -33,5 +41,39 @@ def solution(msg):
             decrypted.append(c)
     return ''.join(decrypted)
 
-import doctest
-doctest.testmod()
\ No newline at end of file
+
+def decode_stream(source, chunk_size=CHUNK_SIZE):
+    """Decrypts an encrypted stream chunk by chunk.
+
+    The cipher maps each byte independently of its neighbours, so the
+    input can be split anywhere and every chunk decrypted on its own with
+    a single `str.translate` call. Only one chunk is held in memory at a
+    time.
+
+    Args:
+        source (file or Iterable[str]): A file-like object opened in
+            binary mode, or any iterable of encrypted byte strings.
+        chunk_size (int, optional): Bytes read per step when `source` is
+            a file-like object. Defaults to CHUNK_SIZE.
+
+    Yields:
+        str: The decrypted chunks, in order.
+
+    Examples:
+
+    >>> ''.join(decode_stream(["wrw blf hvv ozh", "g mrtsg'h vkrhlwv?"]))
+    "did you see last night's episode?"
+    >>> from io import BytesIO
+    >>> list(decode_stream(BytesIO("Yvzs! I xzm'g"), chunk_size=5))
+    ['Yeah!', ' I ca', "n't"]
+    """
+    chunks = source
+    if hasattr(source, 'read'):
+        chunks = iter(lambda: source.read(chunk_size), '')
+
+    for chunk in chunks:
+        yield chunk.translate(ATBASH_TABLE)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
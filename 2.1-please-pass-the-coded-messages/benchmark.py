@@ -0,0 +1,56 @@
+"""Throughput benchmark for per-call and batched queries.
+
+Compares one `solution` call per query against a single `solution_batch`
+call over the same random digit lists.
+
+Usage:
+
+    python benchmark.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import random
+import time
+
+from solution import solution, solution_batch
+
+
+def generate_queries(n, seed=0):
+    """Generates `n` digit lists of 1 to 9 digits each."""
+    rng = random.Random(seed)
+    return [[rng.randint(0, 9) for _ in range(rng.randint(1, 9))]
+            for _ in range(n)]
+
+
+def per_call(queries):
+    return [solution(l) for l in queries]
+
+
+def batched(queries):
+    return solution_batch(queries)
+
+
+def measure(run, queries):
+    start = time.time()
+    answers = run(queries)
+    return time.time() - start, answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print('%10s %20s %20s %10s' % ('queries', 'per-call (q/s)',
+                                   'batched (q/s)', 'speedup'))
+    for n in args.sizes:
+        queries = generate_queries(n)
+        slow, expected = measure(per_call, queries)
+        fast, answers = measure(batched, queries)
+        assert answers == expected, 'Batched answers differ from per-call'
+        print('%10d %20.0f %20.0f %9.1fx' % (
+            n, n / slow, n / fast, slow / fast))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,18 @@ from functools import reduce
 from itertools import combinations
 
 
+# Digits grouped by their residue mod 3, smallest first. These are the
+# candidates for removal when the digit sum is not divisible by 3.
+RESIDUE_DIGITS = {1: (1, 4, 7), 2: (2, 5, 8)}
+
+# Longest list `solution_batch` tallies with a Python loop. Past about
+# this length, ten `list.count` passes in C are faster.
+TALLY_LOOP_LENGTH = 24
+
+# Counts of digits tallied, removed and tried, kept while this is a dict.
+STATS = None
+
+
 def solution(l):
     """
     Finds the largest number that can be made from
@@ -25,10 +37,182 @@ def solution(l):
     >>> solution([3, 1, 4, 1, 5, 9])
     94311
     """
-    
+    return int(largest_multiple_of_three(l))
+
+
+def largest_multiple_of_three(l):
+    """
+    Finds the largest multiple of 3 made from some or all of the digits,
+    in linear time.
+
+    Counts each digit instead of sorting. If the digit sum leaves a
+    remainder, dropping the smallest digit with that same remainder is
+    always the cheapest fix. Failing that, dropping the two smallest digits
+    with the other non-zero remainder always works, since a remainder of 1
+    with no digits in {1, 4, 7} means there are at least two in {2, 5, 8}
+    and vice versa.
+
+    Args:
+        l (List[int]): A list of any length containing digits (0 to 9).
+
+    Returns:
+        str: The decimal digits of the largest such number, or '0' if it
+             is not possible to make one.
+
+    Examples:
+
+    >>> largest_multiple_of_three([3, 1, 4, 1, 5, 9])
+    '94311'
+
+    >>> largest_multiple_of_three([0, 0, 2])
+    '0'
+
+    >>> largest_multiple_of_three([4, 9, 4])
+    '9'
+    """
+    if STATS is not None:
+        STATS['digits_tallied'] += len(l)
+    return largest_from_counts([l.count(d) for d in range(10)])
+
+
+def largest_from_counts(counts):
+    """
+    Finds the largest multiple of 3 made from some or all of the digits,
+    given how many times each digit occurs.
+
+    Args:
+        counts (Sequence[int]): The number of times each digit 0 to 9 occurs.
+
+    Returns:
+        str: The decimal digits of the largest such number, or '0' if it
+             is not possible to make one.
+
+    Examples:
+
+    >>> largest_from_counts([0, 2, 0, 1, 1, 0, 0, 0, 0, 0])
+    '4311'
+    """
+    counts = list(counts)
+    remainder = sum(d * c for d, c in enumerate(counts)) % 3
+
+    if remainder and not remove_smallest(counts, remainder, 1):
+        remove_smallest(counts, 3 - remainder, 2)
+
+    digits = ''.join(str(d) * counts[d] for d in range(9, -1, -1))
+    # Strip leading zeros, leaving a single '0' if nothing else is left.
+    return digits.lstrip('0') or '0'
+
+
+def solution_batch(ls, counts=False):
+    """
+    Answers many independent queries in one call.
+
+    Each query is tallied into digit counts in a single pass and solved
+    with `largest_from_counts`, skipping the per-call overhead of
+    `solution`. Short lists are tallied with one loop over their digits;
+    lists longer than `TALLY_LOOP_LENGTH` use one `list.count` per digit
+    instead, which runs at C speed. Nothing is kept between queries, so
+    memory stays proportional to the largest single query.
+
+    Args:
+        ls (Iterable[Sequence[int]]): The queries, either as digit lists
+            or, if `counts` is set, as rows of 10 digit counts.
+        counts (bool, optional): Whether the queries are digit counts.
+            Defaults to False.
+
+    Returns:
+        List[int]: The answer to each query, in order.
+
+    Examples:
+
+    >>> solution_batch([[3, 1, 4, 1], [3, 1, 4, 1, 5, 9], [1, 4, 3, 1]])
+    [4311, 94311, 4311]
+
+    >>> solution_batch([[0, 2, 0, 1, 1, 0, 0, 0, 0, 0]], counts=True)
+    [4311]
+
+    >>> solution_batch([[7] * 30 + [1]]) == [int('7' * 30)]
+    True
+    """
+    digits = range(10)
+    stats = STATS
+    results = []
+    for l in ls:
+        if counts:
+            tally = l
+        else:
+            if stats is not None:
+                stats['digits_tallied'] += len(l)
+            if len(l) > TALLY_LOOP_LENGTH:
+                tally = [l.count(d) for d in digits]
+            else:
+                tally = [0] * 10
+                for d in l:
+                    tally[d] += 1
+        results.append(int(largest_from_counts(tally)))
+    return results
+
+
+def remove_smallest(counts, residue, k):
+    """
+    Removes the `k` smallest digits whose residue mod 3 is `residue`.
+
+    Args:
+        counts (List[int]): The number of times each digit 0 to 9 occurs.
+                            Updated in place only if `k` digits are found.
+        residue (int): 1 or 2.
+        k (int): How many digits to remove.
+
+    Returns:
+        bool: Whether `k` such digits were available.
+    """
+    removed = []
+    for d in RESIDUE_DIGITS[residue]:
+        while counts[d] and len(removed) < k:
+            counts[d] -= 1
+            removed.append(d)
+
+    if len(removed) < k:
+        for d in removed:
+            counts[d] += 1
+        return False
+    if STATS is not None:
+        STATS['removed_digits'] += k
+    return True
+
+
+def counted(iterable, name):
+    """Yields from `iterable`, counting the items in `STATS[name]`."""
+    for item in iterable:
+        STATS[name] += 1
+        yield item
+
+
+def brute_force(l):
+    """
+    Finds the largest number that can be made from
+    some or all of the digits and is divisible by 3.
+
+    The original submission: tries every combination of digits, largest
+    first. Exponential in the length of `l`, so only suitable for the
+    challenge's 9-digit cap.
+
+    Args:
+        l (List[int]): A list of size 1 to 9 containing some digits (0 to 9).
+
+    Returns:
+        An integer value that meets the above criteria or
+        0, if it is not possible to make such a number.
+
+    Examples:
+
+    >>> brute_force([3, 1, 4, 1, 5, 9])
+    94311
+    """
     # Sorting from the largest digits to smallest digits will ensure we 
     # encounter the combo values from largest to smallest in our for loop.
-    l.sort(reverse=True)
+    l = sorted(l, reverse=True)
+    stats = STATS
 
     if sum(l) % 3 == 0:
         return reduce(lambda acc, n: acc * 10 + n, l)
@@ -37,6 +221,8 @@ def solution(l):
     while digit_count > 0:
         seen = set()
         combos = combinations(l, digit_count)
+        if stats is not None:
+            combos = counted(combos, 'combinations')
 
         for c in combos:
             digit_sum = sum(c)
@@ -51,7 +237,22 @@ def solution(l):
     return 0
 
 
+def test_largest_multiple_of_three(trials=2000, seed=0):
+    """Checks the linear engine against the brute force on random inputs."""
+    import random
+
+    rng = random.Random(seed)
+    for _ in range(trials):
+        l = [rng.randint(0, 9) for _ in range(rng.randint(1, 9))]
+        expected = brute_force(l)
+        result = largest_multiple_of_three(l)
+        assert int(result) == expected, "Expected %s, but got %s for %s" % (
+            expected, result, l)
+        assert result == str(int(result)), "Leading zeros in %s" % result
+
 
-import doctest
+if __name__ == '__main__':
+    import doctest
 
-doctest.testmod()
+    test_largest_multiple_of_three()
+    doctest.testmod()
@@ -0,0 +1,51 @@
+"""Benchmark for the recursive and iterative parent lookups.
+
+Times the original recursive `findParentLabel` against the iterative
+`parentLabel` behind `solution` on random queries. The recursive path is
+skipped for heights that would exceed the interpreter's recursion limit.
+
+Usage:
+
+    python benchmark.py [--queries 1000000] [--heights 30 63 1000]
+"""
+import argparse
+import random
+import sys
+import time
+
+from solution import findParentLabel, getRootLabel, solution
+
+
+def recursive(h, q):
+    return [findParentLabel(c, h, c, h) for c in q]
+
+
+def measure(run, h, q):
+    start = time.time()
+    answers = run(h, q)
+    return time.time() - start, answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=1000000)
+    parser.add_argument('--heights', type=int, nargs='+', default=[30, 63, 1000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print('%8s %20s %20s %10s' % ('height', 'recursive (q/s)',
+                                  'iterative (q/s)', 'speedup'))
+    for h in args.heights:
+        q = [rng.randint(1, getRootLabel(h)) for _ in range(args.queries)]
+        fast, answers = measure(solution, h, q)
+        if h < sys.getrecursionlimit() - 50:
+            slow, expected = measure(recursive, h, q)
+            assert answers == expected, 'Iterative answers differ'
+            print('%8d %20.0f %20.0f %9.1fx' % (
+                h, len(q) / slow, len(q) / fast, slow / fast))
+        else:
+            print('%8d %20s %20.0f %10s' % (h, 'skipped', len(q) / fast, '-'))
+
+
+if __name__ == '__main__':
+    main()
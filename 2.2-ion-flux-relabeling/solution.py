@@ -16,7 +16,7 @@ def solution(h, q):
     >>> solution(3, [7, 3, 5, 1])
     [-1, 7, 6, 3]
     """
-    return [findParentLabel(c, h, c, h) for c in q]
+    return [parentLabel(c, h) for c in q]
 
 
 def getRootLabel(h):
@@ -104,6 +104,271 @@ def findParentLabel(
             )
 
 
-import doctest
+def leafLabel(j):
+    """Finds the label of the `j`th leaf of a flux chain, counting from 0.
 
-doctest.testmod()
+    Post-order emits each leaf followed by the roots of the subtrees it
+    completes, one per trailing 1 bit of `j`, so `2 * j` converters come
+    before leaf `j` less one for every 1 bit of `j`. This holds for any
+    height, since the leaves of a subtree come first in post-order.
+
+    Examples:
+    >>> [leafLabel(j) for j in range(4)]
+    [1, 2, 4, 5]
+    """
+    return 2 * j + 1 - bin(j).count('1')
+
+
+def subtreeLabel(block, k):
+    """Finds the label of the root of the `block`th subtree of height `k`.
+
+    Subtrees of the same height are counted from 0, left to right, so
+    subtree `block` holds leaves `block * 2 ** (k - 1)` onwards. Its root
+    comes straight after its last leaf `j`, whose low `k - 1` bits are all
+    1, so `leafLabel(j) + k - 1` reduces to a closed form.
+
+    Examples:
+    >>> subtreeLabel(0, 3), subtreeLabel(1, 2), subtreeLabel(3, 1)
+    (7, 6, 5)
+    """
+    return ((block + 1) << k) - 1 - bin(block).count('1')
+
+
+def locateLeaf(label, h):
+    """Finds the last leaf at or before a converter, and its subtree height.
+
+    `leafLabel` is strictly increasing, so the converter sits just after
+    the last leaf `j` with `leafLabel(j) <= label`, as the root of the
+    subtree of height `label - leafLabel(j) + 1` that leaf `j` completes.
+    As `j` is about half the label, plus at most `h`,
+    `(label - 1 + popcount) // 2` is almost always `j` itself, and a
+    binary search over the `h // 2` candidates handles the rest, so a
+    lookup costs O(log h) big-int operations at worst.
+
+    Args:
+        label (int): The label of the flux converter.
+        h (int): The height of the flux chain where h = 1 represents a
+                 single node tree.
+
+    Returns:
+        Tuple[int, int]: The index `j` of the leaf, counting from 0, and
+            the height of the subtree rooted at the converter (1 for a
+            leaf). The converter is the root of subtree `j >> (k - 1)` of
+            that height.
+
+    Examples:
+    >>> locateLeaf(7, 3), locateLeaf(3, 3), locateLeaf(5, 3)
+    ((3, 3), (1, 2), (3, 1))
+    """
+    if label == getRootLabel(h):
+        return (1 << (h - 1)) - 1, h
+
+    lo = (label - 1) // 2
+    j = (label - 1 + bin(lo).count('1')) // 2
+    if leafLabel(j) > label:
+        hi = j - 1
+    elif leafLabel(j + 1) > label:
+        lo = hi = j
+    else:
+        lo, hi = j + 1, (label + h - 2) // 2
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if leafLabel(mid) <= label:
+            lo = mid
+        else:
+            hi = mid - 1
+
+    return lo, label - leafLabel(lo) + 1
+
+
+def locateLabel(label, h):
+    """Finds the height of a converter's subtree and which side it is on.
+
+    Bit `k - 1` of the leaf index from `locateLeaf` tells whether the
+    subtree of height `k` rooted at the converter is a left or a right
+    child.
+
+    Args:
+        label (int): The label of the flux converter.
+        h (int): The height of the flux chain where h = 1 represents a
+                 single node tree.
+
+    Returns:
+        Tuple[int, Optional[bool]]: The height of the subtree rooted at
+            the converter (1 for a leaf), and whether it is a left child,
+            or None for the root.
+
+    Examples:
+    >>> locateLabel(7, 3), locateLabel(3, 3), locateLabel(5, 3)
+    ((3, None), (2, True), (1, False))
+    """
+    j, k = locateLeaf(label, h)
+    if k == h:
+        return h, None
+    return k, not (j >> (k - 1)) & 1
+
+
+def parentLabel(label, h):
+    """Finds the parent label for a given flux converter without recursion.
+
+    Every complete subtree of a flux chain holds `2 ** k - 1` converters.
+    Once `locateLabel` finds the height `k` of the converter's subtree:
+      - a left child's parent comes after its right sibling's subtree, at
+        `label + (2 ** k - 1) + 1`;
+      - a right child's parent comes straight after it, at `label + 1`.
+
+    There is no recursion, so trees of any height are supported.
+
+    Args:
+        label (int): The label of the flux converter.
+        h (int): The height of the flux chain where h = 1 represents a
+                 single node tree.
+
+    Returns:
+        int: The label of the parent node, or -1 for the root.
+
+    Examples:
+    >>> [parentLabel(c, 5) for c in [19, 14, 28]]
+    [21, 15, 29]
+
+    >>> parentLabel(2 ** 1000 - 2, 1000) == 2 ** 1000 - 1
+    True
+    """
+    k, isLeft = locateLabel(label, h)
+    if isLeft is None:
+        return -1
+    return label + getRootLabel(k) + 1 if isLeft else label + 1
+
+
+class FluxTree(object):
+    """Navigates a post-order labeled flux chain without building it.
+
+    Every lookup works on labels alone: `locateLeaf` places a converter
+    by the leaf just before it and the height of its subtree, and
+    `subtreeLabel` turns any leaf block back into a label. So ancestors
+    and lowest common ancestors take a fixed number of big-int operations
+    beyond `locateLeaf`, rather than a walk down from the root. Subtree
+    sizes are cached per tree as they are first needed.
+
+    Heights follow `getRootLabel`: h = 1 is a single node tree. Depths
+    count edges from the root, so the root is at depth 0 and the leaves
+    at depth `h - 1`. Missing nodes are reported as -1.
+
+    Examples:
+    >>> tree = FluxTree(3)
+    >>> tree.parent(5), tree.children(6), tree.sibling(3), tree.depth(4)
+    (6, (4, 5), 6, 2)
+    >>> tree.ancestor(4, 1), tree.lca(1, 5), tree.lca(4, 6)
+    (6, 7, 6)
+    >>> tree.parents([7, 3, 5, 1])
+    [-1, 7, 6, 3]
+    """
+
+    def __init__(self, h):
+        if h < 1:
+            raise ValueError("Flux chain height must be at least 1")
+
+        self.h = h
+        self.root = getRootLabel(h)
+        # sizes[k]: getRootLabel(k), the converters in a subtree of height k.
+        self.sizes = {}
+
+    def check(self, label):
+        if not 1 <= label <= self.root:
+            raise ValueError("Label %d is not in a flux chain of height %d"
+                             % (label, self.h))
+
+    def size(self, k):
+        """Returns the number of converters in a subtree of height `k`."""
+        size = self.sizes.get(k)
+        if size is None:
+            size = self.sizes[k] = getRootLabel(k)
+        return size
+
+    def locate(self, label):
+        """Finds the height of a converter's subtree and which side it is on.
+
+        Args:
+            label (int): The label of the flux converter.
+
+        Returns:
+            Tuple[int, Optional[bool]]: The height of the subtree rooted at
+                the converter (1 for a leaf), and whether it is a left
+                child, or None for the root.
+        """
+        self.check(label)
+        return locateLabel(label, self.h)
+
+    def parent(self, label):
+        k, isLeft = self.locate(label)
+        if isLeft is None:
+            return -1
+        return label + self.size(k) + 1 if isLeft else label + 1
+
+    def children(self, label):
+        """Returns the (left, right) children of a converter, or () for a leaf."""
+        k, _ = self.locate(label)
+        if k == 1:
+            return ()
+        return label - self.size(k - 1) - 1, label - 1
+
+    def sibling(self, label):
+        k, isLeft = self.locate(label)
+        if isLeft is None:
+            return -1
+        return label + self.size(k) if isLeft else label - self.size(k)
+
+    def depth(self, label):
+        return self.h - self.locate(label)[0]
+
+    def ancestor(self, label, level):
+        """Returns the ancestor of a converter at depth `level`, or -1 if the
+        converter is not that deep.
+
+        The ancestor's subtree, of height `h - level`, holds the same leaf
+        block as the converter's, so its index is the leaf's shifted right.
+        """
+        self.check(label)
+        j, k = locateLeaf(label, self.h)
+        height = self.h - level
+        if not k <= height <= self.h:
+            return -1
+        return subtreeLabel(j >> (height - 1), height)
+
+    def lca(self, a, b):
+        """Returns the lowest common ancestor of two converters.
+
+        It is the lowest subtree at least as tall as both whose leaf block
+        holds both leaves, so its height is set by the highest bit in which
+        the two leaf indices differ.
+        """
+        self.check(a)
+        self.check(b)
+        ja, ka = locateLeaf(a, self.h)
+        jb, kb = locateLeaf(b, self.h)
+        height = max(ka, kb, (ja ^ jb).bit_length() + 1)
+        return subtreeLabel(ja >> (height - 1), height)
+
+    def parents(self, labels):
+        return [self.parent(label) for label in labels]
+
+    def childrenOf(self, labels):
+        return [self.children(label) for label in labels]
+
+    def siblings(self, labels):
+        return [self.sibling(label) for label in labels]
+
+    def depths(self, labels):
+        return [self.depth(label) for label in labels]
+
+    def ancestors(self, labels, level):
+        return [self.ancestor(label, level) for label in labels]
+
+    def lcas(self, pairs):
+        return [self.lca(a, b) for a, b in pairs]
+
+
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,39 @@
+"""Per-append cost benchmark for LuckyTripleCounter.
+
+Streams random access codes into a counter and reports the average cost
+of an append over each window, which should stay flat as the stream
+grows.
+
+Usage:
+
+    python benchmark.py [--codes 2000000] [--window 250000] [--max-value 1000000]
+"""
+import argparse
+import random
+import time
+
+from solution import LuckyTripleCounter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--codes', type=int, default=2000000)
+    parser.add_argument('--window', type=int, default=250000)
+    parser.add_argument('--max-value', type=int, default=1000000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    counter = LuckyTripleCounter()
+    print('%12s %16s %20s' % ('codes', 'us/append', 'triples'))
+    while len(counter) < args.codes:
+        window = [rng.randint(1, args.max_value) for _ in range(args.window)]
+        start = time.time()
+        for x in window:
+            counter.append(x)
+        elapsed = time.time() - start
+        print('%12d %16.2f %20d' % (
+            len(counter), elapsed / len(window) * 1e6, counter.count()))
+
+
+if __name__ == '__main__':
+    main()
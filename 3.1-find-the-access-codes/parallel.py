@@ -0,0 +1,133 @@
+"""Multi-process pairwise lucky-triple counter.
+
+For lists whose values are too large for `divisor_lattice_count`, the
+pairwise algorithm is spread over a process pool. Every lucky triple is
+centred on its middle element b = l[j], so
+
+    count = sum over j of dividends[j] * multiples[j]
+
+where dividends[j] counts the i < j with l[i] dividing l[j], and
+multiples[j] counts the k > j with l[j] dividing l[k]. Both factors only
+depend on j, so each worker takes a contiguous range of j and the
+partial sums are simply added up.
+
+Each factor is computed with one list comprehension of the modulo over a
+whole slice followed by `list.count(0)`. The `%` operator is used rather
+than mapping `b.__mod__`, which returns NotImplemented, not a remainder,
+when ints and longs are mixed.
+
+Usage:
+
+    python parallel.py [--size 4000] [--workers 1 2 4 8 16]
+"""
+import argparse
+import random
+import time
+from multiprocessing import Pool
+
+from solution import pairwise_count
+
+# The list shared with pool workers, set once per worker by `share`.
+shared = None
+
+
+def share(l):
+    global shared
+    shared = l
+
+
+def middle_counts(l, start, stop):
+    """Sums dividends[j] * multiples[j] for j in [start, stop).
+
+    Args:
+        l (List[int]): A list of positive integers.
+        start (int): The first middle index.
+        stop (int): One past the last middle index.
+
+    Returns:
+        int: The number of lucky triples whose middle index is in range.
+
+    Examples:
+    >>> middle_counts([1, 2, 3, 4, 5, 6], 0, 6)
+    3
+    >>> sum(middle_counts([1, 1, 1, 1, 1], j, j + 1) for j in range(5))
+    10
+
+    Ints and longs mix:
+
+    >>> middle_counts([1, 2, 10 ** 20, 2 * 10 ** 20], 0, 4)
+    4
+    """
+    count = 0
+    for j in range(start, stop):
+        b = l[j]
+        dividends = [b % a for a in l[:j]].count(0)
+        if dividends:
+            count += dividends * [c % b for c in l[j + 1:]].count(0)
+    return count
+
+
+def shared_middle_counts(bounds):
+    return middle_counts(shared, *bounds)
+
+
+def parallel_count(l, processes, chunks_per_process=8):
+    """Counts the number of 'lucky triples' in a list with a process pool.
+
+    Args:
+        l (List[int]): A list of positive integers.
+        processes (int): The number of worker processes. 1 runs in-process.
+        chunks_per_process (int, optional): How many ranges of j each worker
+            gets on average, for load balancing. Defaults to 8.
+
+    Returns:
+        int: The count of 'lucky triples' in a list.
+
+    Examples:
+    >>> parallel_count([1, 2, 10 ** 20, 2 * 10 ** 20], 2)
+    4
+    """
+    n = len(l)
+    if processes <= 1:
+        return middle_counts(l, 0, n)
+
+    step = max(1, n // (processes * chunks_per_process))
+    bounds = [(start, min(start + step, n)) for start in range(0, n, step)]
+    pool = Pool(processes, initializer=share, initargs=(l,))
+    try:
+        return sum(pool.imap_unordered(shared_middle_counts, bounds))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=4000)
+    parser.add_argument('--max-value', type=int, default=10 ** 20)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # Mix small divisors into huge values so there are triples to find.
+    l = [rng.choice([1, 2, 3, 6]) * rng.randint(1, args.max_value // 6)
+         if rng.random() < 0.5 else rng.choice([1, 2, 3, 6])
+         for _ in range(args.size)]
+
+    start = time.time()
+    expected = pairwise_count(l)
+    baseline = time.time() - start
+    print('pairwise_count: %.2fs (%d triples)' % (baseline, expected))
+
+    print('%8s %10s %10s' % ('workers', 'time (s)', 'speedup'))
+    for processes in args.workers:
+        start = time.time()
+        count = parallel_count(l, processes)
+        elapsed = time.time() - start
+        assert count == expected, 'Parallel count differs from pairwise'
+        print('%8d %10.2f %9.1fx' % (processes, elapsed, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
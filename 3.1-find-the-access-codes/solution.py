@@ -32,7 +32,7 @@ def solution(l):
     3
 
     >>> solution([1, 1, 1, 1, 1])
-    10 
+    10
 
     >>> solution([2, 3, 5, 7, 11])
     0
@@ -40,6 +40,58 @@ def solution(l):
     >>> solution([1, 1])
     0
     """
+    if use_divisor_lattice(l):
+        return divisor_lattice_count(l)
+    return pairwise_count(l)
+
+
+# Largest value the divisor lattice engine will sieve up to. Its tables
+# take about 60 bytes per value: some 60 MB here, but 600 MB at 10 ** 7.
+MAX_SIEVE_VALUE = 10 ** 6
+
+# Costs of the divisor lattice engine in units of one pairwise modulo check
+# (about 0.1us), measured on random codes: sieving costs 1.5 to 3.5 per
+# value up to max(l), and each element costs 40 to 150 for its divisors.
+SIEVE_COST = 4
+DIVISOR_COST = 128
+
+
+def use_divisor_lattice(l):
+    """Decides whether the divisor lattice engine is cheaper for `l`.
+
+    The pairwise engine does about n**2 / 2 modulo operations. The divisor
+    lattice engine sieves up to the largest value and then touches every
+    divisor of every element, each far slower than one modulo, as weighed
+    by `SIEVE_COST` and `DIVISOR_COST`. With values up to 10 ** 6, it takes
+    over at about 3000 codes.
+
+    Args:
+        l (List[int]): A list of positive integers.
+
+    Returns:
+        bool: True if `divisor_lattice_count` should be used.
+    """
+    n = len(l)
+    if n < 3:
+        return False
+    max_value = max(l)
+    return (max_value <= MAX_SIEVE_VALUE
+            and SIEVE_COST * max_value + DIVISOR_COST * n < n * n // 2)
+
+
+def pairwise_count(l):
+    """Counts the number of 'lucky triples' in a list by checking every pair.
+
+    Args:
+        l (List[int]): A list of positive integers.
+
+    Returns:
+        int: The count of 'lucky triples' in a list.
+
+    Examples:
+    >>> pairwise_count([1, 2, 3, 4, 5, 6])
+    3
+    """
 
     # Keep track of the number of times an element appears as a valid dividend.
     dividends = [0] * len(l)
@@ -56,5 +108,315 @@ def solution(l):
 
     return count
 
-import doctest
-doctest.testmod()
+
+def divisor_lattice_count(l):
+    """Counts the number of 'lucky triples' in a list through divisor lists.
+
+    Every lucky triple is centred on its middle element b = l[j], so the
+    count is the sum over j of
+
+        (the number of i < j where l[i] divides l[j])
+      * (the number of k > j where l[j] divides l[k]).
+
+    Both factors are read from per-value tallies: a left-to-right pass
+    looks up how often each divisor of l[j] has been seen so far, and a
+    right-to-left pass credits every divisor of l[k] once l[k] has been
+    seen. The cost is the sieve up to max(l) plus the total number of
+    divisors of the elements, independent of n**2.
+
+    Args:
+        l (List[int]): A list of positive integers.
+
+    Returns:
+        int: The count of 'lucky triples' in a list.
+
+    Examples:
+    >>> divisor_lattice_count([1, 2, 3, 4, 5, 6])
+    3
+    >>> divisor_lattice_count([1, 1, 1, 1, 1])
+    10
+    """
+    if not l:
+        return 0
+
+    max_value = max(l)
+    spf = smallest_prime_factors(max_value)
+    cache = {}
+
+    def divisors_of(x):
+        divs = cache.get(x)
+        if divs is None:
+            divs = cache[x] = divisors(x, spf)
+        return divs
+
+    # seen[v]: how many times value `v` occurs to the left of the current index.
+    seen = [0] * (max_value + 1)
+    divisors_before = []
+    for x in l:
+        divisors_before.append(sum(seen[d] for d in divisors_of(x)))
+        seen[x] += 1
+
+    # multiples_after[v]: how many elements to the right of the current index
+    # are multiples of `v`.
+    multiples_after = [0] * (max_value + 1)
+    count = 0
+    for j in range(len(l) - 1, -1, -1):
+        x = l[j]
+        count += divisors_before[j] * multiples_after[x]
+        for d in divisors_of(x):
+            multiples_after[d] += 1
+
+    return count
+
+
+def smallest_prime_factors(n):
+    """Sieves the smallest prime factor of every integer up to `n`.
+
+    Args:
+        n (int): The largest integer to sieve.
+
+    Returns:
+        List[int]: spf[x] is the smallest prime factor of x for x >= 2.
+
+    Examples:
+    >>> smallest_prime_factors(10)
+    [0, 1, 2, 3, 2, 5, 2, 7, 2, 3, 2]
+    """
+    spf = list(range(n + 1))
+    p = 2
+    while p * p <= n:
+        if spf[p] == p:
+            for q in range(p * p, n + 1, p):
+                if spf[q] == q:
+                    spf[q] = p
+        p += 1
+    return spf
+
+
+def divisors(x, spf):
+    """Lists every divisor of `x` from its prime factorization.
+
+    Prime factors are read off the sieve once what is left of `x` is
+    within it, and found by trial division before that.
+
+    Args:
+        x (int): A positive integer.
+        spf (List[int]): Smallest prime factors, as from
+            `smallest_prime_factors`.
+
+    Returns:
+        List[int]: The divisors of `x`, in no particular order.
+
+    Examples:
+    >>> sorted(divisors(12, smallest_prime_factors(12)))
+    [1, 2, 3, 4, 6, 12]
+    >>> sorted(divisors(2 * 999983 ** 2, smallest_prime_factors(10)))
+    [1, 2, 999983, 1999966, 999966000289, 1999932000578]
+    """
+    divs = [1]
+    # The next trial divisor for what is left of `x` past the sieve.
+    p = 2
+    while x > 1:
+        if x < len(spf):
+            p = spf[x]
+        else:
+            while p * p <= x and x % p:
+                p += 1 if p == 2 else 2
+            if p * p > x:
+                p = x
+        power = 1
+        powers = []
+        while x % p == 0:
+            x //= p
+            power *= p
+            powers.append(power)
+        divs += [d * q for d in divs for q in powers]
+    return divs
+
+
+def write_varint(out, n):
+    """Appends a non-negative integer of any size to `out` as a varint.
+
+    Uses seven bits per byte, least significant first, with the top bit
+    set on every byte but the last.
+
+    Args:
+        out (bytearray): The buffer to append to.
+        n (int): A non-negative integer.
+
+    Examples:
+    >>> out = bytearray()
+    >>> write_varint(out, 300)
+    >>> list(out)
+    [172, 2]
+    """
+    while n >= 0x80:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_varint(data, pos):
+    """Reads a varint written by `write_varint`.
+
+    Args:
+        data (bytearray): The buffer to read from.
+        pos (int): The offset of the varint's first byte.
+
+    Returns:
+        Tuple[int, int]: The integer and the offset just past it.
+
+    Examples:
+    >>> read_varint(bytearray([172, 2, 5]), 0)
+    (300, 2)
+    """
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+class LuckyTripleCounter(object):
+    """Counts 'lucky triples' in a list that only ever grows at the end.
+
+    Keeps the same `dividends` bookkeeping as `pairwise_count`, summed per
+    value: `dividends[v]` is the total, over every element equal to `v`,
+    of how many earlier elements divide it. Appending `x` closes one lucky
+    triple for each of those earlier divisions whose dividend divides `x`,
+    so each append costs one pass over the divisors of `x`.
+
+    Examples:
+    >>> counter = LuckyTripleCounter()
+    >>> for x in [1, 2, 3, 4, 5, 6]:
+    ...     counter.append(x)
+    >>> counter.count()
+    3
+    >>> LuckyTripleCounter.restore(counter.snapshot()).count()
+    3
+
+    Codes past `MAX_SIEVE_VALUE` do not grow the sieve:
+
+    >>> counter.extend([10 ** 9, 2 * 10 ** 9])
+    >>> counter.count(), len(counter.spf) <= MAX_SIEVE_VALUE + 1
+    (15, True)
+
+    Counts past 64 bits survive a snapshot:
+
+    >>> counter.triples = 2 ** 70
+    >>> LuckyTripleCounter.restore(counter.snapshot()).count() == 2 ** 70
+    True
+    """
+
+    # Snapshot layout: magic, triple count, list length and the number of
+    # distinct values, followed by a (value, occurrences, dividends) triple
+    # per distinct value. Every field after the magic is a varint, since
+    # the counts outgrow 64 bits: 5 million equal codes already make more
+    # than 2 ** 64 triples.
+    MAGIC = b'LTC2'
+
+    def __init__(self, l=()):
+        self.triples = 0
+        self.length = 0
+        self.occurrences = {}
+        self.dividends = {}
+        self.spf = smallest_prime_factors(1)
+        for x in l:
+            self.append(x)
+
+    def divisors_of(self, x):
+        if len(self.spf) <= x <= MAX_SIEVE_VALUE:
+            # Grow the sieve geometrically so re-sieving stays amortized
+            # O(1), but only up to MAX_SIEVE_VALUE: `divisors` factors
+            # larger codes by trial division instead.
+            self.spf = smallest_prime_factors(
+                min(max(x, 2 * len(self.spf)), MAX_SIEVE_VALUE))
+        return divisors(x, self.spf)
+
+    def append(self, x):
+        """Adds `x` to the end of the list and updates the count.
+
+        Args:
+            x (int): A positive integer.
+        """
+        if x < 1:
+            raise ValueError("Access codes must be positive integers")
+
+        occurrences = self.occurrences
+        dividends = self.dividends
+        divides_x = 0
+        for d in self.divisors_of(x):
+            if d in occurrences:
+                divides_x += occurrences[d]
+                self.triples += dividends[d]
+
+        occurrences[x] = occurrences.get(x, 0) + 1
+        dividends[x] = dividends.get(x, 0) + divides_x
+        self.length += 1
+
+    def extend(self, l):
+        for x in l:
+            self.append(x)
+
+    def count(self):
+        """Returns the number of 'lucky triples' in the list so far."""
+        return self.triples
+
+    def __len__(self):
+        return self.length
+
+    def snapshot(self):
+        """Serializes the counter to a compact binary string.
+
+        Returns:
+            bytes: The state needed to resume counting.
+        """
+        out = bytearray(self.MAGIC)
+        for n in (self.triples, self.length, len(self.occurrences)):
+            write_varint(out, n)
+        for value, occurrences in self.occurrences.items():
+            for n in (value, occurrences, self.dividends[value]):
+                write_varint(out, n)
+        return bytes(out)
+
+    @classmethod
+    def restore(cls, data):
+        """Rebuilds a counter from the output of `snapshot`.
+
+        Args:
+            data (bytes): A serialized counter.
+
+        Returns:
+            LuckyTripleCounter: A counter in the same state.
+        """
+        if data[:len(cls.MAGIC)] != cls.MAGIC:
+            raise ValueError("Not a LuckyTripleCounter snapshot")
+        data = bytearray(data)
+        fields = []
+        pos = len(cls.MAGIC)
+        try:
+            while pos < len(data):
+                n, pos = read_varint(data, pos)
+                fields.append(n)
+            triples, length, num_values = fields[:3]
+        except (IndexError, ValueError):
+            raise ValueError("Truncated LuckyTripleCounter snapshot")
+        if len(fields) != 3 + 3 * num_values:
+            raise ValueError("Truncated LuckyTripleCounter snapshot")
+
+        counter = cls()
+        counter.triples = triples
+        counter.length = length
+        for i in range(3, len(fields), 3):
+            value, occurrences, dividends = fields[i:i + 3]
+            counter.occurrences[value] = occurrences
+            counter.dividends[value] = dividends
+        return counter
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,45 @@
+"""Throughput benchmark for Queue To Do checksums.
+
+Times `solution_batch` on random (start, length) queries against one
+`solution` call per query. The per-row loop in `solution` is only timed
+on the first `--baseline-queries` queries and its rate extrapolated.
+
+Usage:
+
+    python benchmark.py [--queries 1000000] [--max-length 100000]
+"""
+import argparse
+import random
+import time
+
+from solution import solution, solution_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=1000000)
+    parser.add_argument('--max-length', type=int, default=100000)
+    parser.add_argument('--baseline-queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    queries = [(rng.randint(0, 2000000000), rng.randint(1, args.max_length))
+               for _ in range(args.queries)]
+
+    sample = queries[:args.baseline_queries]
+    start = time.time()
+    expected = [solution(*query) for query in sample]
+    slow = (time.time() - start) / len(sample)
+
+    start = time.time()
+    checksums = solution_batch(queries)
+    fast = (time.time() - start) / len(queries)
+    assert checksums[:len(sample)] == expected, 'Batch checksums differ'
+
+    print('solution:       %12.0f queries/s (%d queries)' % (1 / slow, len(sample)))
+    print('solution_batch: %12.0f queries/s (%d queries)' % (1 / fast, len(queries)))
+    print('speedup:        %11.1fx' % (slow / fast))
+
+
+if __name__ == '__main__':
+    main()
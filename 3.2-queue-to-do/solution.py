@@ -1,3 +1,7 @@
+from functools import reduce
+from operator import xor
+
+
 def solution(start, length):
     """Generate security checksum.
 
@@ -66,5 +70,222 @@ def xorBetween(start, stop):
         return consecutiveXor(start-1) ^ consecutiveXor(stop)
 
 
-import doctest
-doctest.testmod()
+def solution_batch(queries):
+    """Generate security checksums for many checkpoints at once.
+
+    Args:
+        queries (Iterable[Tuple[int, int]]): (start, length) pairs.
+
+    Returns:
+        List[int]: The security checksum for each pair, in order.
+
+    Examples:
+    >>> solution_batch([(0, 3), (17, 4), (2000000000, 1), (5, 10 ** 4)])
+    [2, 14, 2000000000, 120154384]
+    """
+    return [fastChecksum(start, length) if length <= CLOSED_FORM_LENGTH
+            else closedFormChecksum(start, length)
+            for start, length in queries]
+
+
+# Line length above which `closedFormChecksum` beats folding every row.
+CLOSED_FORM_LENGTH = 2048
+
+
+def fastChecksum(start, length):
+    """Generate security checksum without a Python-level loop per row.
+
+    Row `r` checks the IDs from `start + r * length` up to
+    `start + length - 1 + r * (length - 1)`, so its XOR is
+    `consecutiveXor(low) ^ consecutiveXor(high)` where both `low` and
+    `high` step through arithmetic progressions. `xorProgression` folds
+    each progression at C speed.
+
+    Falls back to `solution` when the IDs no longer fit in a machine word.
+
+    Args:
+        start (int): The ID of the first worker to be checked.
+        length (int): The length of the line before automatic review occurs.
+
+    Returns:
+        int: The security checksum.
+
+    Examples:
+    >>> fastChecksum(17, 4)
+    14
+    >>> fastChecksum(2 ** 70, 3) == solution(2 ** 70, 3)
+    True
+    """
+    try:
+        return (xorProgression(start - 1, length, length)
+                ^ xorProgression(start + length - 1, length - 1, length))
+    except OverflowError:
+        return solution(start, length)
+
+
+def closedFormChecksum(start, length):
+    """Generate security checksum in time polylogarithmic in the line length.
+
+    Same row decomposition as `fastChecksum`, but every sub-progression is
+    folded with `xorArithmetic`, which counts set bits per bit position in
+    closed form instead of visiting each row.
+
+    Args:
+        start (int): The ID of the first worker to be checked.
+        length (int): The length of the line before automatic review occurs.
+
+    Returns:
+        int: The security checksum.
+
+    Examples:
+    >>> closedFormChecksum(0, 3), closedFormChecksum(17, 4)
+    (2, 14)
+    """
+    return (xorProgression(start - 1, length, length, xorArithmetic)
+            ^ xorProgression(start + length - 1, length - 1, length,
+                             xorArithmetic))
+
+
+def xorRange(first, step, count):
+    """Calculates the XOR of `first + i * step` for i in range(count) by
+    folding every term.
+
+    Raises:
+        OverflowError: If a term does not fit in a machine word.
+    """
+    return reduce(xor, xrange(first, first + count * step, step), 0)
+
+
+def xorArithmetic(first, step, count):
+    """Calculates the XOR of `first + i * step` for i in range(count) in
+    closed form.
+
+    Bit `b` of the XOR is the parity of how many terms have bit `b` set.
+    Since bit `b` of `x` is `x // 2**b - 2 * (x // 2**(b + 1))`, that
+    parity equals the parity of the sum of `(first + i * step) // 2**b`,
+    which `floorSum` computes without visiting the terms.
+
+    Args:
+        first (int): The first term, at least 0.
+        step (int): The difference between consecutive terms, at least 0.
+        count (int): The number of terms.
+
+    Returns:
+        int: The XOR of the terms.
+
+    Examples:
+    >>> xorArithmetic(5, 3, 4) == 5 ^ 8 ^ 11 ^ 14
+    True
+    """
+    if count <= 0:
+        return 0
+
+    result = 0
+    last = first + (count - 1) * step
+    for b in range(last.bit_length()):
+        if floorSum(count, 1 << b, step, first) & 1:
+            result |= 1 << b
+    return result
+
+
+def floorSum(n, m, a, b):
+    """Calculates the sum of `(a * i + b) // m` for i in range(n).
+
+    Euclid-like reduction: whole multiples of `m` in `a` and `b` are summed
+    directly, then the roles of `a` and `m` are swapped by counting
+    lattice points from the other axis. Takes O(log(m + a)) steps.
+
+    Args:
+        n (int): The number of terms.
+        m (int): The divisor, at least 1.
+        a (int): The slope, at least 0.
+        b (int): The offset, at least 0.
+
+    Returns:
+        int: The sum.
+
+    Examples:
+    >>> floorSum(4, 3, 2, 1) == sum((2 * i + 1) // 3 for i in range(4))
+    True
+    """
+    total = 0
+    while True:
+        if a >= m:
+            total += n * (n - 1) // 2 * (a // m)
+            a %= m
+        if b >= m:
+            total += n * (b // m)
+            b %= m
+        y_max = a * n + b
+        if y_max < m:
+            return total
+        n, b = divmod(y_max, m)
+        m, a = a, m
+
+
+def xorProgression(first, step, count, fold=xorRange):
+    """Calculates the XOR of `consecutiveXor(first + i * step)` for i in
+    range(count).
+
+    `consecutiveXor(n)` only depends on `n % 4`, and terms that are 4 apart
+    in the progression share the same residue. Splitting the progression
+    into the 4 sub-progressions of stride `4 * step` leaves, per residue:
+      - 0: the XOR of the terms themselves,
+      - 1: 1 for every term,
+      - 2: the XOR of the terms, each with the low bit flipped,
+      - 3: nothing.
+
+    Args:
+        first (int): The first term; -1 contributes nothing.
+        step (int): The difference between consecutive terms.
+        count (int): The number of terms.
+        fold (Callable[[int, int, int], int], optional): XORs the terms of
+            an arithmetic progression given (first, step, count). Defaults
+            to `xorRange`.
+
+    Returns:
+        int: The XOR of `consecutiveXor` over the progression.
+
+    Raises:
+        OverflowError: If `fold` is `xorRange` and a term does not fit in a
+            machine word.
+    """
+    if step == 0 or count == 1:
+        return consecutiveXor(first) if count & 1 else 0
+
+    stop = first + count * step
+    result = 0
+    for k in range(min(4, count)):
+        n = first + k * step
+        mod = n % 4
+        if mod == 3:
+            continue
+        terms = (stop - n + 4 * step - 1) // (4 * step)
+        if mod == 1:
+            result ^= terms & 1
+        else:
+            result ^= fold(n, 4 * step, terms)
+            if mod == 2:
+                result ^= terms & 1
+    return result
+
+
+def test_closedFormChecksum(trials=2000, seed=0):
+    """Checks the closed-form engine against the row loop on random inputs."""
+    import random
+
+    rng = random.Random(seed)
+    for _ in range(trials):
+        start = rng.randint(0, rng.choice([10, 1000, 2000000000, 2 ** 70]))
+        length = rng.randint(1, rng.choice([4, 50, 400]))
+        expected = solution(start, length)
+        result = closedFormChecksum(start, length)
+        assert result == expected, "Expected %s, but got %s for %s" % (
+            expected, result, (start, length))
+
+
+if __name__ == '__main__':
+    import doctest
+
+    test_closedFormChecksum()
+    doctest.testmod()
@@ -0,0 +1,78 @@
+"""Benchmark for the Fraction and Bareiss Doomsday Fuel solvers.
+
+Times `solution` (Fraction Gauss-Jordan inverse) against
+`bareiss_solution` (one fraction-free integer solve) on random dense
+transition matrices. The Fraction path is skipped above `--fraction-limit`
+states.
+
+Usage:
+
+    python benchmark.py [--sizes 10 100 500 1000] [--fraction-limit 50]
+"""
+import argparse
+import random
+import time
+
+from solution import bareiss_solution, solution
+
+
+def generate_matrix(num_states, seed=0, absorbing_fraction=0.1, density=0.5,
+                    max_count=9):
+    """Generates a random transition matrix where every transient state can
+    reach an absorbing one.
+
+    Args:
+        num_states (int): The number of ore states.
+        seed (int, optional): The random seed. Defaults to 0.
+        absorbing_fraction (float, optional): The share of absorbing states.
+        density (float, optional): The share of nonzero transitions per row.
+        max_count (int, optional): The largest transition count.
+
+    Returns:
+        List[List[int]]: The transition matrix.
+    """
+    rng = random.Random(seed)
+    num_absorbing = max(1, int(num_states * absorbing_fraction))
+    absorbing = set(rng.sample(range(1, num_states), num_absorbing)
+                    if num_states > 1 else [0])
+    m = []
+    for source in range(num_states):
+        row = [0] * num_states
+        if source not in absorbing:
+            for destination in range(num_states):
+                if rng.random() < density:
+                    row[destination] = rng.randint(1, max_count)
+            row[rng.choice(sorted(absorbing))] += 1
+        m.append(row)
+    return m
+
+
+def measure(solver, m):
+    start = time.time()
+    result = solver([row[:] for row in m])
+    return time.time() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10, 100, 500, 1000])
+    parser.add_argument('--fraction-limit', type=int, default=50)
+    args = parser.parse_args()
+
+    print('%8s %14s %14s %10s' % ('states', 'Fraction (s)', 'Bareiss (s)',
+                                  'speedup'))
+    for num_states in args.sizes:
+        m = generate_matrix(num_states)
+        fast, result = measure(bareiss_solution, m)
+        if num_states <= args.fraction_limit:
+            slow, expected = measure(solution, m)
+            assert result == expected, 'Bareiss result differs from Fraction'
+            print('%8d %14.3f %14.3f %9.1fx' % (
+                num_states, slow, fast, slow / fast))
+        else:
+            print('%8d %14s %14.3f %10s' % (num_states, 'skipped', fast, '-'))
+
+
+if __name__ == '__main__':
+    main()
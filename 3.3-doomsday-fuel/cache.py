@@ -0,0 +1,204 @@
+"""Memoized Doomsday Fuel solver for repeated and lightly edited matrices.
+
+`SolutionCache` keys every transition matrix by a hash of its contents
+and keeps the fundamental matrix `N = (I - Q)^-1` of recently solved ones
+in LRU order, within a budget on the total number of cached cells.
+
+A matrix seen before is answered from the cache. A matrix that differs
+from a cached one in only a few transient rows, with the same terminal
+states, reuses that entry's `N` through the Sherman-Morrison-Woodbury
+identity: if rows `S` of `Q` change by `D`, then with `U` the columns
+`S` of the identity,
+
+    N' = N + (N U) (I - D N U)^-1 (D N)
+
+which costs O(k * t**2) for k changed rows instead of the O(t**3) of a
+full inversion.
+"""
+import hashlib
+from collections import OrderedDict
+from fractions import Fraction
+
+from solution import (calculate_fundamental_matrix, format_result,
+                      invert_matrix, multiply_matrix, solution, split_matrix)
+
+
+def matrix_key(m):
+    """Hashes a transition matrix canonically.
+
+    Examples:
+    >>> matrix_key([[0, 1], [0, 0]]) == matrix_key(((0, 1), (0, 0)))
+    True
+    """
+    return hashlib.sha1(repr([list(row) for row in m]).encode()).hexdigest()
+
+
+def probability_rows(row, transient_states, absorbing_states):
+    """Splits one transient row of a transition matrix into its Q and R rows.
+
+    Examples:
+    >>> probability_rows([0, 1, 3], {0: 0, 1: 1}, {2: 0})
+    ([Fraction(0, 1), Fraction(1, 4)], [Fraction(3, 4)])
+    """
+    total = sum(row)
+    Q_row = [0] * len(transient_states)
+    R_row = [0] * len(absorbing_states)
+    for destination, count in enumerate(row):
+        prob = Fraction(count, total)
+        if destination in transient_states:
+            Q_row[transient_states[destination]] = prob
+        else:
+            R_row[absorbing_states[destination]] = prob
+    return Q_row, R_row
+
+
+class CacheEntry(object):
+
+    def __init__(self, m, result, N=None, transient_states=None,
+                 absorbing_states=None, R=None):
+        self.rows = [tuple(row) for row in m]
+        self.result = result
+        self.N = N
+        self.transient_states = transient_states
+        self.absorbing_states = absorbing_states
+        self.R = R
+        self.cells = len(N) ** 2 if N else 1
+
+
+class SolutionCache(object):
+    """Caches Doomsday Fuel solutions and their fundamental matrices.
+
+    Examples:
+    >>> cache = SolutionCache()
+    >>> m = [[0, 1, 0, 0, 0, 1], [4, 0, 0, 3, 2, 0], [0, 0, 0, 0, 0, 0],
+    ...      [0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0]]
+    >>> cache.solution(m)
+    [0, 3, 2, 9, 14]
+    >>> cache.solution(m)
+    [0, 3, 2, 9, 14]
+    >>> cache.solution([m[0], [4, 0, 0, 3, 1, 0]] + m[2:])
+    [0, 3, 1, 8, 12]
+    >>> sorted(cache.stats().items())
+    [('evictions', 0), ('hits', 1), ('misses', 1), ('updates', 1)]
+    """
+
+    def __init__(self, max_cells=10 ** 6, max_update_rows=4):
+        """
+        Args:
+            max_cells (int, optional): The most fundamental matrix cells to
+                keep across all entries. Defaults to 10**6.
+            max_update_rows (int, optional): The most changed rows for which
+                a low-rank update is tried instead of a full solve.
+                Defaults to 4.
+        """
+        self.max_cells = max_cells
+        self.max_update_rows = max_update_rows
+        self.entries = OrderedDict()
+        self.cells = 0
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+        self.evictions = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'updates': self.updates,
+            'evictions': self.evictions,
+        }
+
+    def solution(self, m):
+        """Predicts the ore state of an ore sample, reusing earlier work.
+
+        Args:
+            m (List[List[int]]): The transition matrix.
+
+        Returns:
+            List[int]: The numerators for the probabilities for each terminal state,
+                        then the denominator at the end of the list.
+        """
+        key = matrix_key(m)
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.hits += 1
+        else:
+            entry = self.update(m)
+            if entry is not None:
+                self.updates += 1
+            else:
+                self.misses += 1
+                entry = self.solve(m)
+            self.cells += entry.cells
+
+        self.entries[key] = entry
+        self.evict()
+        return list(entry.result)
+
+    def solve(self, m):
+        if not m or sum(m[0]) == 0:
+            return CacheEntry(m, solution(m))
+
+        transient_states, absorbing_states, Q, R = split_matrix(m)
+        N = calculate_fundamental_matrix(Q)
+        return CacheEntry(m, self.result(N, R), N, transient_states,
+                          absorbing_states, R)
+
+    def update(self, m):
+        """Builds an entry for `m` from a cached matrix a few rows away.
+
+        Returns:
+            Optional[CacheEntry]: The new entry, or None if no cached matrix
+                is close enough.
+        """
+        rows = [tuple(row) for row in m]
+        for entry in reversed(self.entries.values()):
+            if entry.N is None or len(entry.rows) != len(rows):
+                continue
+            changed = []
+            for i, (old, new) in enumerate(zip(entry.rows, rows)):
+                if old != new:
+                    changed.append(i)
+                    if len(changed) > self.max_update_rows:
+                        break
+            else:
+                if changed and all(i in entry.transient_states and sum(rows[i])
+                                   for i in changed):
+                    return self.woodbury(entry, m, changed)
+        return None
+
+    def woodbury(self, entry, m, changed):
+        N = entry.N
+        positions = [entry.transient_states[i] for i in changed]
+
+        # D holds the changes to Q in the changed rows only.
+        D = []
+        R = [row[:] for row in entry.R]
+        for i, position in zip(changed, positions):
+            old_Q_row, _ = probability_rows(entry.rows[i], entry.transient_states,
+                                            entry.absorbing_states)
+            new_Q_row, R[position] = probability_rows(m[i], entry.transient_states,
+                                                      entry.absorbing_states)
+            D.append([new - old for new, old in zip(new_Q_row, old_Q_row)])
+
+        NU = [[row[c] for c in positions] for row in N]
+        DN = multiply_matrix(D, N)
+        DNU = multiply_matrix(D, NU)
+        k = len(changed)
+        C = invert_matrix([[int(a == b) - DNU[a][b] for b in range(k)]
+                           for a in range(k)])
+        correction = multiply_matrix(multiply_matrix(NU, C), DN)
+        N = [[a + b for a, b in zip(N_row, c_row)]
+             for N_row, c_row in zip(N, correction)]
+
+        return CacheEntry(m, self.result(N, R), N, entry.transient_states,
+                          entry.absorbing_states, R)
+
+    def result(self, N, R):
+        return format_result(multiply_matrix([N[0]], R)[0])
+
+    def evict(self):
+        while self.cells > self.max_cells and len(self.entries) > 1:
+            _, entry = self.entries.popitem(last=False)
+            self.cells -= entry.cells
+            self.evictions += 1
@@ -1,5 +1,20 @@
 from fractions import Fraction, gcd
 from functools import reduce
+from operator import mul
+
+# Elimination step counts for invert_matrix, kept while this is a dict.
+STATS = None
+
+# States from which `solution` hands a chain to `modular_solution`. From
+# here on p-adic lifting beats Bareiss, and the Fraction inverse by far.
+MODULAR_MIN_STATES = 50
+
+# The word-sized primes `p_adic_solve` works modulo, tried in turn when the
+# system is singular modulo one of them.
+LIFTING_PRIMES = (2147483647, 2147483629, 2147483587)
+
+# Lifting steps between attempts to rebuild the solution in `p_adic_solve`.
+LIFTING_CHECK_STEPS = 8
 
 
 def solution(m):
@@ -39,7 +54,40 @@ def solution(m):
     
     if sum(m[0]) == 0:
         return [1] + [0 for row in m[1:] if sum(row) == 0] + [1]
+
+    if num_states >= MODULAR_MIN_STATES:
+        return modular_solution(m)
     
+    transient_states, absorbing_states, Q, R = split_matrix(m)
+
+    # Calculate the fundamental matrix N = (I_t - Q)**(-1)
+    N = calculate_fundamental_matrix(Q)
+    
+    # The probability of being absorbed in the absorbing state `j`
+    # when starting from transient state `i` is given by the `(i, j)`-entry
+    # of the matrix B = NR
+    B = multiply_matrix(N, R)
+
+    # Since the ore starts in state 0 and
+    # the processing always ends in a stable state,
+    # we only need the first row of B.
+    return format_result(B[0])
+
+
+def split_matrix(m):
+    """Splits a transition matrix into its transient and absorbing parts.
+
+    Args:
+        m (List[List[int]]): The transition matrix.
+
+    Returns:
+        Tuple[Dict[int, int], Dict[int, int], List[List[Fraction]], List[List[Fraction]]]:
+            The index of each transient state among the transient states,
+            the index of each absorbing state among the absorbing states,
+            and the matrices Q and R.
+    """
+    num_states = len(m)
+
     transient_states = {}
     absorbing_states = {}
     for i in range(num_states):
@@ -59,14 +107,11 @@ def solution(m):
     # from the "i"-th transient state to the "j"-th absorbing state.
     R = [[0 for _ in range(r)] for _ in range(t)]
 
-    for source in range(num_states):
+    for source in transient_states:
+        total = sum(m[source])
+        from_t = transient_states[source]
         for destination in range(num_states):
-            if source in absorbing_states:
-                continue
-
-            total = sum(m[source])
             prob = Fraction(m[source][destination], total)
-            from_t = transient_states[source]
 
             if destination in transient_states:
                 to_t = transient_states[destination]
@@ -75,20 +120,20 @@ def solution(m):
                 to_a = absorbing_states[destination]
                 R[from_t][to_a] = prob
 
+    return transient_states, absorbing_states, Q, R
 
-    # Calculate the fundamental matrix N = (I_t - Q)**(-1)
-    N = calculate_fundamental_matrix(Q)
-    
-    # The probability of being absorbed in the absorbing state `j`
-    # when starting from transient state `i` is given by the `(i, j)`-entry
-    # of the matrix B = NR
-    B = multiply_matrix(N, R)
 
-    # Since the ore starts in state 0 and
-    # the processing always ends in a stable state,
-    # we only need the first row of B.
-    end_probs = B[0]
+def format_result(end_probs):
+    """Puts absorption probabilities over their least common denominator.
 
+    Args:
+        end_probs (List[Fraction]): The probability of ending in each
+            terminal state.
+
+    Returns:
+        List[int]: The numerators for the probabilities for each terminal state,
+                    then the denominator at the end of the list.
+    """
     # Calculate the least common denominator for all probabilities in `end_probs`.
     lcd = reduce(lcm, [p.denominator for p in end_probs])
 
@@ -100,6 +145,663 @@ def solution(m):
     return result
 
 
+def bareiss_solution(m):
+    """Predicts the ore state of an ore sample using integer arithmetic only.
+
+    Scaling each transient row of `I - Q` by its row total gives an integer
+    matrix `A`, with `A[i][j] = total_i * (i == j) - m[i][j]`, and the
+    scaled `R` is just the raw counts `m[i][a]`. Then `B = A^-1 * counts`,
+    and only its first row is needed, so a single fraction-free solve of
+    `A^T y = e_0` replaces the full inverse.
+
+    Args:
+        m (List[List[int]]): The transition matrix.
+
+    Returns:
+        List[int]: The numerators for the probabilities for each terminal state,
+                    then the denominator at the end of the list.
+
+    Examples:
+    >>> bareiss_solution([
+    ...     [0, 1, 0, 0, 0, 1],
+    ...     [4, 0, 0, 3, 2, 0],
+    ...     [0, 0, 0, 0, 0, 0],
+    ...     [0, 0, 0, 0, 0, 0],
+    ...     [0, 0, 0, 0, 0, 0],
+    ...     [0, 0, 0, 0, 0, 0],
+    ... ])
+    [0, 3, 2, 9, 14]
+    """
+    return integer_solution(m, fraction_free_solve)
+
+
+def modular_solution(m):
+    """Predicts the ore state of an ore sample with p-adic lifting.
+
+    Solves the same integer system as `bareiss_solution` with
+    `p_adic_solve`, which keeps every elimination step on word-sized
+    residues. It wins on large dense chains, where the Bareiss integers
+    grow as large as the determinant.
+
+    Args:
+        m (List[List[int]]): The transition matrix.
+
+    Returns:
+        List[int]: The numerators for the probabilities for each terminal state,
+                    then the denominator at the end of the list.
+
+    Examples:
+    >>> modular_solution([
+    ...     [0, 2, 1, 0, 0],
+    ...     [0, 0, 0, 3, 4],
+    ...     [0, 0, 0, 0, 0],
+    ...     [0, 0, 0, 0, 0],
+    ...     [0, 0, 0, 0, 0],
+    ... ])
+    [7, 6, 8, 21]
+    """
+    return integer_solution(m, p_adic_solve)
+
+
+def integer_solution(m, solve):
+    """Predicts the ore state of an ore sample with a pluggable integer solver.
+
+    Builds the integer system `[A^T | e_0]` described in `bareiss_solution`
+    and turns its solution into the `[numerators..., lcd]` output.
+
+    Args:
+        m (List[List[int]]): The transition matrix.
+        solve (Callable[[List[List[int]]], Tuple[int, List[int]]]): Takes
+            an n-by-(n + 1) integer matrix `[A | b]` and returns a nonzero
+            `d` and `d * x`, where `A x = b`. May modify the matrix. See
+            `fraction_free_solve` and `p_adic_solve`.
+
+    Returns:
+        List[int]: The numerators for the probabilities for each terminal state,
+                    then the denominator at the end of the list.
+    """
+    num_states = len(m)
+
+    if num_states == 0:
+        return []
+
+    totals = [sum(row) for row in m]
+    if totals[0] == 0:
+        return [1] + [0 for total in totals[1:] if total == 0] + [1]
+
+    transient_states = [i for i in range(num_states) if totals[i]]
+    absorbing_states = [i for i in range(num_states) if not totals[i]]
+
+    # Row `k` of A^T is column `transient_states[k]` of A, augmented with
+    # e_0. State 0 is transient, so it is the first transient state.
+    augmented = [
+        [(totals[source] if source == destination else 0) - m[source][destination]
+         for source in transient_states] + [int(k == 0)]
+        for k, destination in enumerate(transient_states)
+    ]
+    det, scaled_y = solve(augmented)
+
+    numerators = [sum(y * m[source][a] for y, source in zip(scaled_y, transient_states))
+                  for a in absorbing_states]
+    if det < 0:
+        det = -det
+        numerators = [-n for n in numerators]
+
+    divisor = reduce(gcd, numerators, det)
+    result = [n // divisor for n in numerators]
+    result.append(det // divisor)
+
+    return result
+
+
+def fraction_free_solve(augmented):
+    """Solves a square integer system with Bareiss elimination.
+
+    Runs fraction-free Gauss-Jordan elimination on `[A | b]` in place.
+    Every intermediate entry is a minor of the input, so each division is
+    exact and the integers only grow as large as the determinant.
+
+    Args:
+        augmented (List[List[int]]): An n-by-(n + 1) integer matrix `[A | b]`.
+
+    Returns:
+        Tuple[int, List[int]]: `d`, which is det(A) up to sign, and `d * x`
+            where `A x = b`.
+
+    Raises:
+        ValueError: If A is singular.
+
+    Examples:
+    >>> fraction_free_solve([[2, 1, 5], [1, 3, 10]])
+    (5, [5, 15])
+    """
+    n = len(augmented)
+    previous = 1
+    for k in range(n):
+        if augmented[k][k] == 0:
+            swap = next((i for i in range(k + 1, n) if augmented[i][k]), None)
+            if swap is None:
+                raise ValueError("Matrix is singular")
+            augmented[k], augmented[swap] = augmented[swap], augmented[k]
+
+        pivot_row = augmented[k]
+        pivot = pivot_row[k]
+        for i in range(n):
+            if i == k:
+                continue
+            row = augmented[i]
+            factor = row[k]
+            if factor:
+                augmented[i] = [(pivot * a - factor * b) // previous
+                                for a, b in zip(row, pivot_row)]
+            elif pivot != previous:
+                augmented[i] = [pivot * a // previous for a in row]
+        previous = pivot
+
+    return previous, [row[n] for row in augmented]
+
+
+def p_adic_solve(augmented):
+    """Solves a square integer system by p-adic lifting (Dixon's method).
+
+    A is inverted once modulo a word-sized prime p. Each lifting step then
+    finds the next base-p digit of x with two matrix-vector products on
+    small integers, so after the inverse the work grows by n**2 per digit
+    instead of the n**3 of a fresh elimination. Every
+    `LIFTING_CHECK_STEPS` steps the digits so far are turned back into
+    fractions with `reconstruct_vector` and checked exactly against the
+    system. Past the Hadamard bound on the solution's numerators and
+    denominator the rebuilt fractions are certain to be right.
+
+    Args:
+        augmented (List[List[int]]): An n-by-(n + 1) integer matrix `[A | b]`.
+
+    Returns:
+        Tuple[int, List[int]]: The least common denominator `d` of x, and
+            `d * x` where `A x = b`.
+
+    Raises:
+        ValueError: If A is singular.
+
+    Examples:
+    >>> p_adic_solve([[2, 1, 5], [1, 3, 10]])
+    (1, [1, 3])
+    >>> p_adic_solve([[3, 1, 1], [1, 2, 0]])
+    (5, [2, -1])
+    """
+    n = len(augmented)
+    A = [row[:n] for row in augmented]
+    b = [row[n] for row in augmented]
+    for p in LIFTING_PRIMES:
+        inverse = inverse_mod(A, p)
+        if inverse is not None:
+            break
+    else:
+        # Singular, or det(A) is a multiple of every prime tried.
+        return fraction_free_solve(augmented)
+
+    # By Cramer's rule the numerators and denominator are determinants of
+    # matrices whose rows are no longer than those of `[A | b]`.
+    hadamard_bits = sum(sum(a * a for a in row).bit_length() // 2 + 1
+                        for row in augmented)
+    residual = b
+    x = [0] * n
+    modulus = 1
+    steps = 0
+    while modulus.bit_length() <= 2 * hadamard_bits + 1:
+        digits = [sum(map(mul, row, residual)) % p for row in inverse]
+        residual = [(r - sum(map(mul, row, digits))) // p
+                    for r, row in zip(residual, A)]
+        x = [value + modulus * digit for value, digit in zip(x, digits)]
+        modulus *= p
+        steps += 1
+        if steps % LIFTING_CHECK_STEPS == 0:
+            candidate = reconstruct_vector(x, modulus)
+            if candidate is not None and solves(A, b, *candidate):
+                return candidate
+
+    candidate = reconstruct_vector(x, modulus)
+    if candidate is None or not solves(A, b, *candidate):
+        raise ValueError("Lifting failed to converge")
+    return candidate
+
+
+def inverse_mod(matrix, p):
+    """Inverts a square integer matrix modulo a prime.
+
+    Returns:
+        Optional[List[List[int]]]: The inverse, with entries in [0, p), or
+            None if the matrix is singular modulo `p`.
+
+    Examples:
+    >>> inverse_mod([[2, 1], [1, 3]], 7)
+    [[2, 4], [4, 6]]
+    >>> inverse_mod([[1, 2], [2, 4]], 7) is None
+    True
+    """
+    n = len(matrix)
+    rows = [[a % p for a in row] + [int(i == j) for j in range(n)]
+            for i, row in enumerate(matrix)]
+    for k in range(n):
+        pivot = next((i for i in range(k, n) if rows[i][k]), None)
+        if pivot is None:
+            return None
+        rows[k], rows[pivot] = rows[pivot], rows[k]
+        # Columns left of k are already cleared, except in their own rows.
+        scale = pow(rows[k][k], p - 2, p)
+        pivot_row = rows[k] = rows[k][:k] + [a * scale % p for a in rows[k][k:]]
+        pivot_tail = pivot_row[k:]
+        for i in range(n):
+            row = rows[i]
+            factor = row[k]
+            if i != k and factor:
+                rows[i] = row[:k] + [(a - factor * c) % p
+                                     for a, c in zip(row[k:], pivot_tail)]
+    return [row[n:] for row in rows]
+
+
+def reconstruct_vector(residues, modulus):
+    """Rebuilds rational numbers with a common denominator from residues.
+
+    Each residue is first multiplied by the denominator found so far, which
+    often leaves a small integer; otherwise `rational_reconstruction` finds
+    the extra factor the denominator needs.
+
+    Args:
+        residues (List[int]): Each x_i modulo `modulus`.
+        modulus (int): The modulus.
+
+    Returns:
+        Optional[Tuple[int, List[int]]]: A positive common denominator `d`
+            and `d * x`, or None if there is no such `d` below the square
+            root of `modulus / 2`.
+
+    Examples:
+    >>> reconstruct_vector([2 * 34 % 101, 5 * 34 % 101], 101)  # 2/3, 5/3
+    (3, [2, 5])
+    """
+    bound = isqrt(modulus // 2)
+    denominator = 1
+    numerators = []
+    for residue in residues:
+        numerator = residue * denominator % modulus
+        if numerator > modulus // 2:
+            numerator -= modulus
+        if abs(numerator) > bound:
+            fraction = rational_reconstruction(numerator, modulus, bound)
+            if fraction is None:
+                return None
+            numerator, scale = fraction
+            denominator *= scale
+            if denominator > bound:
+                return None
+            numerators = [a * scale for a in numerators]
+        numerators.append(numerator)
+    # int() turns Python 2 longs that fit a word back into ints.
+    return int(denominator), [int(a) for a in numerators]
+
+
+def rational_reconstruction(residue, modulus, bound):
+    """Finds a/b with |a|, b <= `bound` and a = b * `residue` mod `modulus`.
+
+    Runs the extended Euclidean algorithm on (modulus, residue) until the
+    remainder drops to `bound`.
+
+    Returns:
+        Optional[Tuple[int, int]]: (a, b) with b > 0, or None if there is
+            no such fraction.
+
+    Examples:
+    >>> rational_reconstruction(34, 101, 7)  # 3 * 34 = 1 mod 101
+    (1, 3)
+    >>> rational_reconstruction(-34, 101, 7)
+    (-1, 3)
+    """
+    r0, r1 = modulus, residue % modulus
+    t0, t1 = 0, 1
+    while r1 > bound:
+        q = r0 // r1
+        r0, r1 = r1, r0 - q * r1
+        t0, t1 = t1, t0 - q * t1
+    if t1 == 0 or abs(t1) > bound:
+        return None
+    if t1 < 0:
+        return -r1, -t1
+    return r1, t1
+
+
+def solves(A, b, denominator, numerators):
+    """Checks exactly that `A * numerators == denominator * b`."""
+    return all(sum(map(mul, row, numerators)) == denominator * value
+               for row, value in zip(A, b))
+
+
+def isqrt(n):
+    """Returns the largest integer whose square does not exceed `n`.
+
+    Newton's method on integers, since floats overflow on the moduli here.
+
+    Examples:
+    >>> isqrt(24), isqrt(25), isqrt(10 ** 400) == 10 ** 200
+    (4, 5, True)
+    """
+    if n < 2:
+        return n
+    r = 1 << ((n.bit_length() + 1) // 2)
+    while True:
+        s = (r + n // r) // 2
+        if s >= r:
+            return r
+        r = s
+
+
+def sparse_solution(transitions):
+    """Predicts the ore state of an ore sample from a sparse transition list.
+
+    Only nonzero transitions are ever touched, and transient states that
+    cannot be reached from state 0 are dropped up front.
+
+    The reachable transient states are split into strongly connected
+    components and visited in topological order, pushing the probability
+    mass that flows out of state 0 forward. Within a component of a single
+    state the mass only needs dividing by the chance of leaving it; larger
+    components are solved exactly with `fraction_free_solve`. Mass that
+    reaches a terminal state stays there, giving the absorption
+    probabilities.
+
+    Every mass is kept as an integer numerator over one shared denominator:
+    the product of each component's divisor, which is its leaving count
+    for a single state or its determinant otherwise. Each division along
+    the chain is then exact, and no gcd is taken until the end. Fractions
+    would renormalise at every step, which costs a gcd of ever longer
+    integers.
+
+    The numerators are about as long as the answer's denominator, which
+    grows linearly with the number of states on long chains, so the work
+    grows with the number of nonzeros times that length. On
+    `benchmarks.generators.sparse_transitions`, 2000 states take 0.03s,
+    10000 take 0.8s and 100000 take about three minutes, where the answer's
+    denominator alone has a quarter of a million bits.
+
+    Args:
+        transitions (List[Union[Dict[int, int], List[Tuple[int, int]]]]):
+            For each state, its (destination, count) transitions, either as
+            a dict or as a list of pairs. States without transitions, or
+            whose counts are all 0, are terminal. See `csr_to_transitions`
+            and `dense_to_transitions`.
+
+    Returns:
+        List[int]: The numerators for the probabilities for each terminal state,
+                    then the denominator at the end of the list.
+
+    Examples:
+    >>> sparse_solution([{1: 2, 2: 1}, {3: 3, 4: 4}, {}, {}, {}])
+    [7, 6, 8, 21]
+    >>> sparse_solution([[(1, 1), (5, 1)], [(0, 4), (3, 3), (4, 2)], [], [], [], []])
+    [0, 3, 2, 9, 14]
+    """
+    num_states = len(transitions)
+
+    if num_states == 0:
+        return []
+
+    counts = []
+    for row in transitions:
+        pairs = row.items() if isinstance(row, dict) else row
+        counts.append([(destination, count) for destination, count in pairs if count])
+
+    absorbing_states = [i for i in range(num_states) if not counts[i]]
+
+    if not counts[0]:
+        return [1] + [0] * (len(absorbing_states) - 1) + [1]
+
+    totals = [sum(count for _, count in row) for row in counts]
+    successors = lambda state: [destination for destination, _ in counts[state]
+                                if counts[destination]]
+
+    # systems[k]: the integer matrix of `solve_component` for components of
+    # more than one state, else None. divisors[k]: what the masses leaving
+    # the k-th component may be divided by.
+    components = strongly_connected_components(0, successors)
+    systems = []
+    divisors = []
+    for component in components:
+        if len(component) == 1:
+            state = component[0]
+            stay = sum(count for destination, count in counts[state]
+                       if destination == state)
+            systems.append(None)
+            divisors.append(totals[state] - stay)
+        else:
+            system = component_system(component, counts, totals)
+            det, _ = fraction_free_solve([row + [0] for row in system])
+            systems.append(system)
+            divisors.append(abs(det))
+    denominator = reduce(mul, divisors, 1)
+
+    # inflow[state]: `denominator` times the probability mass that enters
+    # `state`, starting with the ore sample itself entering state 0.
+    inflow = {0: denominator}
+    for component, system, divisor in zip(components, systems, divisors):
+        if system is None:
+            # Mass leaving through each transition, per unit count.
+            per_count = {component[0]: inflow.pop(component[0], 0) // divisor}
+        else:
+            per_count = solve_component(component, system, inflow)
+
+        for state, mass in per_count.items():
+            for destination, count in counts[state]:
+                if destination not in per_count:
+                    inflow[destination] = inflow.get(destination, 0) + mass * count
+
+    numerators = [inflow.get(state, 0) for state in absorbing_states]
+    return lowest_terms(numerators, denominator)
+
+
+def lowest_terms(numerators, denominator):
+    """Divides numerators and their shared denominator by their gcd.
+
+    A factor common to every numerator divides any sum of their multiples,
+    and such a sum seldom shares other factors with the denominator, so one
+    gcd usually finds the divisor. Each quotient is then checked by
+    multiplying it back, which costs far less than a long division or a gcd
+    per numerator on long integers; a failed check shrinks the divisor.
+
+    Args:
+        numerators (List[int]): Nonnegative numerators.
+        denominator (int): Their positive denominator.
+
+    Returns:
+        List[int]: The reduced numerators, then the reduced denominator.
+
+    Examples:
+    >>> lowest_terms([6, 0, 12], 18)
+    [1, 0, 2, 3]
+    >>> lowest_terms([2, 3, 1], 6)
+    [2, 3, 1, 6]
+    """
+    values = numerators + [denominator]
+    longest = max(value.bit_length() for value in values)
+    divisor = gcd(denominator, sum(k * k * value for k, value in enumerate(values, 1)))
+    divide = exact_division(divisor, longest)
+    result = []
+    for value in values:
+        quotient = divide(value)
+        if quotient * divisor != value:
+            smaller = gcd(divisor, value)
+            ratio = divisor // smaller
+            result = [q * ratio for q in result]
+            divisor = smaller
+            divide = exact_division(divisor, longest)
+            quotient = divide(value)
+        result.append(quotient)
+    return result
+
+
+def exact_division(divisor, longest):
+    """Makes a function dividing nonnegative integers of up to `longest`
+    bits by `divisor`, assuming each division is exact.
+
+    Multiplies by the inverse of the divisor modulo a power of two as long
+    as the longest quotient: a multiplication instead of a long division.
+    The quotient of an inexact division is garbage.
+
+    Examples:
+    >>> divide = exact_division(6, 102)
+    >>> [divide(n) == n // 6 for n in (0, 12, 3 * 10 ** 30)]
+    [True, True, True]
+    """
+    shift = (divisor & -divisor).bit_length() - 1
+    odd = divisor >> shift
+    bits = max(1, longest - shift - odd.bit_length() + 1)
+    mask = (1 << bits) - 1
+    # Newton's iteration doubles the number of correct low bits.
+    inverse, known = 1, 1
+    while known < bits:
+        known *= 2
+        inverse = inverse * (2 - odd * inverse) & ((1 << known) - 1)
+    return lambda n: ((n >> shift) & mask) * inverse & mask
+
+
+def component_system(component, counts, totals):
+    """Builds the integer matrix `A^T` of a strongly connected component.
+
+    The expected visits `y` to the component's states satisfy
+    `(I - Q)^T y = b`, where `b` is the mass entering from outside. Scaling
+    row `i` of `I - Q` by its total gives an integer matrix `A`, and the
+    mass leaving each state per unit count is `z = y / total`, which solves
+    `A^T z = b`.
+
+    Args:
+        component (List[int]): The states of the component.
+        counts (List[List[Tuple[int, int]]]): The (destination, count)
+            transitions of every state.
+        totals (List[int]): The row total of every state.
+
+    Returns:
+        List[List[int]]: `A^T`, with rows and columns in component order.
+
+    Examples:
+    >>> component_system([1, 2], [[], [(2, 3), (0, 1)], [(1, 2)]], [0, 4, 2])
+    [[4, -2], [-3, 2]]
+    """
+    position = dict((state, k) for k, state in enumerate(component))
+    size = len(component)
+    # Row `k` of A^T is column `component[k]` of A.
+    system = [[0] * size for _ in component]
+    for source in component:
+        i = position[source]
+        system[i][i] += totals[source]
+        for destination, count in counts[source]:
+            if destination in position:
+                system[position[destination]][i] -= count
+    return system
+
+
+def solve_component(component, system, inflow):
+    """Spreads the mass entering a strongly connected component over it.
+
+    Args:
+        component (List[int]): The states of the component.
+        system (List[List[int]]): Its `component_system`.
+        inflow (Dict[int, int]): The mass entering each state, as numerators
+            over a denominator that det(system) divides. Entries for
+            the component are consumed.
+
+    Returns:
+        Dict[int, int]: `z` for every state in the component, over the same
+            denominator.
+    """
+    entering = [inflow.pop(state, 0) for state in component]
+    det, scaled_z = fraction_free_solve([row + [b] for row, b in zip(system, entering)])
+    return dict((state, scaled_z[k] // det) for k, state in enumerate(component))
+
+
+def strongly_connected_components(start, successors):
+    """Lists the strongly connected components reachable from `start`.
+
+    Iterative Tarjan's algorithm, so deep chains do not hit the recursion
+    limit.
+
+    Args:
+        start (int): The state to search from.
+        successors (Callable[[int], List[int]]): The states a state leads to.
+
+    Returns:
+        List[List[int]]: The components, in topological order.
+
+    Examples:
+    >>> graph = {0: [1], 1: [2, 3], 2: [1], 3: []}
+    >>> strongly_connected_components(0, graph.get)
+    [[0], [2, 1], [3]]
+    """
+    index = {start: 0}
+    low = {start: 0}
+    stack = [start]
+    on_stack = set(stack)
+    work = [(start, iter(successors(start)))]
+    components = []
+
+    while work:
+        state, remaining = work[-1]
+        for destination in remaining:
+            if destination not in index:
+                index[destination] = low[destination] = len(index)
+                stack.append(destination)
+                on_stack.add(destination)
+                work.append((destination, iter(successors(destination))))
+                break
+            elif destination in on_stack:
+                low[state] = min(low[state], index[destination])
+        else:
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[state])
+            if low[state] == index[state]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == state:
+                        break
+                components.append(component)
+
+    components.reverse()
+    return components
+
+
+def csr_to_transitions(indptr, indices, data):
+    """Converts a transition matrix in CSR form into `sparse_solution` input.
+
+    Args:
+        indptr (List[int]): Row `i` is stored in positions
+            `indptr[i]` up to but excluding `indptr[i + 1]`.
+        indices (List[int]): The destination state of each stored count.
+        data (List[int]): The stored counts.
+
+    Returns:
+        List[List[Tuple[int, int]]]: The (destination, count) pairs per state.
+
+    Examples:
+    >>> csr_to_transitions([0, 2, 2], [0, 1], [3, 4])
+    [[(0, 3), (1, 4)], []]
+    """
+    return [list(zip(indices[indptr[i]:indptr[i + 1]], data[indptr[i]:indptr[i + 1]]))
+            for i in range(len(indptr) - 1)]
+
+
+def dense_to_transitions(m):
+    """Converts a dense transition matrix into `sparse_solution` input.
+
+    Examples:
+    >>> dense_to_transitions([[0, 2, 1], [0, 0, 0], [0, 0, 0]])
+    [[(1, 2), (2, 1)], [], []]
+    """
+    return [[(j, count) for j, count in enumerate(row) if count] for row in m]
+
+
 def calculate_fundamental_matrix(Q):
     # Check if Q is a valid input matrix
     n = len(Q)
@@ -121,6 +823,7 @@ def invert_matrix(matrix):
 
     # Augment the matrix with the identity matrix of the same size
     augmented = [row + [int(i == j) for i in range(n)] for j, row in enumerate(matrix)]
+    stats = STATS
 
     # Perform Gaussian elimination to transform the augmented matrix to row-echelon form
     for i in range(n):
@@ -129,6 +832,9 @@ def invert_matrix(matrix):
 
         # Swap the rows to bring the maximum value to the current row
         augmented[i], augmented[max_row] = augmented[max_row], augmented[i]
+        if stats is not None:
+            stats['pivots'] += 1
+            stats['row_swaps'] += max_row != i
 
         # Scale the current row to make the pivot equal to 1
         pivot = augmented[i][i]
@@ -137,6 +843,8 @@ def invert_matrix(matrix):
         # Eliminate the values above and below the current pivot
         for j in range(n):
             if i != j:
+                if stats is not None:
+                    stats['row_operations'] += 1
                 factor = augmented[j][i]
                 augmented[j] = [element - factor * augmented[i][k] for k, element in enumerate(augmented[j])]
 
@@ -200,7 +908,8 @@ def test_solution():
 
     print("All test cases passed.")
 
-test_solution()
+if __name__ == '__main__':
+    import doctest
 
-import doctest
-doctest.testmod()
+    test_solution()
+    doctest.testmod()
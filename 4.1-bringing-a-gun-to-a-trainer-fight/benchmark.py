@@ -0,0 +1,51 @@
+"""Benchmark for the atan2, exact lattice and streaming trainer-fight engines.
+
+Times `solution` against `lattice_solution` and `streaming_solution` in a
+tiny room, where the number of mirrored rooms grows with the square of
+the distance. `solution` is skipped above `--solution-limit`.
+
+Usage:
+
+    python benchmark.py [--distances 100 1000 3000 10000] [--solution-limit 3000]
+"""
+import argparse
+import time
+
+from solution import lattice_solution, solution, streaming_solution
+
+DIMENSIONS = [3, 2]
+YOUR_POSITION = [1, 1]
+TRAINER_POSITION = [2, 1]
+
+
+def measure(engine, distance):
+    start = time.time()
+    count = engine(DIMENSIONS, YOUR_POSITION, TRAINER_POSITION, distance)
+    return time.time() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--distances', type=int, nargs='+',
+                        default=[100, 1000, 3000, 10000])
+    parser.add_argument('--solution-limit', type=int, default=3000)
+    args = parser.parse_args()
+
+    print('%10s %14s %14s %14s %12s %12s' % (
+        'distance', 'atan2 (s)', 'lattice (s)', 'streaming (s)', 'atan2',
+        'exact'))
+    for distance in args.distances:
+        fast, count = measure(lattice_solution, distance)
+        streaming, streamed = measure(streaming_solution, distance)
+        assert streamed == count, 'Streaming count differs from lattice'
+        if distance <= args.solution_limit:
+            slow, expected = measure(solution, distance)
+            print('%10d %14.3f %14.3f %14.3f %12d %12d' % (
+                distance, slow, fast, streaming, expected, count))
+        else:
+            print('%10d %14s %14.3f %14.3f %12s %12d' % (
+                distance, 'skipped', fast, streaming, '-', count))
+
+
+if __name__ == '__main__':
+    main()
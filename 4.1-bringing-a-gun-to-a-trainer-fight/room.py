@@ -0,0 +1,321 @@
+"""Batch trainer-fight scenarios that share one room.
+
+A `Room` answers many (your_position, trainer_position, distance)
+scenarios for fixed dimensions. Scenarios with the same shooter and
+trainer only differ in how far the beam reaches, so the room walks the
+mirrored lattice for them once, at the longest distance asked for, and
+keeps the sorted beam lengths of every direction that hits the trainer.
+Each scenario is then a binary search.
+
+Pairs with the same shooter also share the shooter's own images: the
+room keeps, per shooter, the nearest image of the shooter along every
+direction, so each new trainer only walks the trainer's images. Pairs
+missing from the cache can be spread over a process pool that the room
+keeps open between batches; the workers get one job per shooter and their
+beam lengths are merged back into the cache.
+
+Usage:
+
+    python room.py [--scenarios 10000] [--shooters 10] [--pairs 200] [--processes N]
+"""
+import argparse
+import random
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from math import pi
+from multiprocessing import Pool
+
+from solution import hitting_offsets, mirrored_offsets
+
+# Above this many estimated images of the shooter, its nearest-image table
+# is not built and every pair streams `hitting_offsets` instead.
+MAX_SHOOTER_IMAGES = 200000
+
+
+class Room(object):
+    """Answers trainer-fight scenarios for one set of room dimensions.
+
+    Examples:
+    >>> room = Room([3, 2])
+    >>> room.count_directions([1, 1], [2, 1], 4)
+    7
+    >>> room.count_directions_batch([([1, 1], [2, 1], 4), ([1, 1], [2, 1], 2)])
+    [7, 1]
+    >>> room.count_directions_batch([([1, 1], [2, 1], 4), ([1, 1], [1, 1], 4)],
+    ...                             processes=2)
+    [7, 0]
+    >>> sorted(room.lengths)
+    [((1, 1), (1, 1)), ((1, 1), (2, 1))]
+    >>> room.close()
+    """
+
+    def __init__(self, dimensions, max_pairs=256, max_shooters=16):
+        """
+        Args:
+            dimensions (List[int]): The width and height of the room.
+            max_pairs (int, optional): The most shooter/trainer pairs whose
+                beam lengths are kept, least recently used first out.
+                Defaults to 256.
+            max_shooters (int, optional): The most shooters whose nearest
+                images are kept, least recently used first out. Defaults
+                to 16.
+        """
+        self.dimensions = list(dimensions)
+        self.max_pairs = max_pairs
+        self.max_shooters = max_shooters
+        # lengths[(shooter, trainer)]: (distance, sorted squared lengths of
+        # the hitting beams up to that distance).
+        self.lengths = OrderedDict()
+        # shooters[shooter]: (distance, nearest squared length of an image
+        # of the shooter along each direction, up to that distance).
+        self.shooters = OrderedDict()
+        self.pool = None
+        self.processes = 1
+
+    def hit_lengths(self, your_position, trainer_position, distance):
+        """Returns the sorted squared lengths of every beam that hits the
+        trainer, covering at least `distance`.
+        """
+        key = (tuple(your_position), tuple(trainer_position))
+        cached = self.lengths.get(key)
+        if cached is None or cached[0] < distance:
+            blockers = self.shooter_images(key[0], distance)
+            cached = (distance, pair_lengths(self.dimensions, key[0], key[1],
+                                             distance, blockers))
+        self.store(key, cached)
+        return cached[1]
+
+    def shooter_images(self, your_position, distance):
+        """Returns the nearest squared length of an image of the shooter
+        along each direction, or None if there are too many images to keep.
+
+        A table built for a longer distance serves shorter ones: an image
+        only blocks a beam if it is nearer than the trainer image it hides.
+        """
+        cached = self.shooters.pop(your_position, None)
+        if cached is None or cached[0] < distance:
+            cached = (distance, nearest_images(self.dimensions, your_position,
+                                               distance))
+        self.shooters[your_position] = cached
+        while len(self.shooters) > self.max_shooters:
+            self.shooters.popitem(last=False)
+        return cached[1]
+
+    def store(self, key, cached):
+        self.lengths.pop(key, None)
+        self.lengths[key] = cached
+        while len(self.lengths) > self.max_pairs:
+            self.lengths.popitem(last=False)
+
+    def count_directions(self, your_position, trainer_position, distance):
+        """Counts the directions you can fire in to hit the trainer.
+
+        Args:
+            your_position (List[int]): Your x and y coordinates in the room.
+            trainer_position (List[int]): The trainer's x and y coordinates.
+            distance (int): The maximum distance the beam can travel.
+
+        Returns:
+            int: The number of distinct directions that hit the trainer.
+        """
+        lengths = self.hit_lengths(your_position, trainer_position, distance)
+        return bisect_right(lengths, distance * distance)
+
+    def count_directions_batch(self, scenarios, processes=1):
+        """Counts the hitting directions for many scenarios.
+
+        Args:
+            scenarios (List[Tuple[List[int], List[int], int]]): The
+                (your_position, trainer_position, distance) of each scenario.
+            processes (int, optional): The number of worker processes for
+                pairs that are not cached yet. 1 answers in-process. The
+                pool is kept until `close` or a different count is asked
+                for. Defaults to 1.
+
+        Returns:
+            List[int]: The number of hitting directions per scenario, in order.
+        """
+        # reach[(shooter, trainer)]: the longest distance asked for.
+        reach = OrderedDict()
+        for your_position, trainer_position, distance in scenarios:
+            key = (tuple(your_position), tuple(trainer_position))
+            reach[key] = max(reach.get(key, 0), distance)
+
+        missing = OrderedDict()
+        for key, distance in reach.items():
+            cached = self.lengths.get(key)
+            if cached is None or cached[0] < distance:
+                missing.setdefault(key[0], []).append((key[1], distance))
+
+        if processes > 1 and sum(len(pairs) for pairs in missing.values()) > 1:
+            jobs = [(self.dimensions, shooter, pairs)
+                    for shooter, pairs in split_jobs(missing, processes)]
+            for shooter, answered in zip(
+                    [job[1] for job in jobs],
+                    self.get_pool(processes).map(shooter_lengths, jobs)):
+                for trainer, cached in answered:
+                    self.store((shooter, trainer), cached)
+            hits = dict((key, self.lengths.get(key)) for key in reach)
+        else:
+            hits = {}
+        for key, distance in reach.items():
+            cached = hits.get(key)
+            if cached is None or cached[0] < distance:
+                # Not merged, or already pushed out of a small cache.
+                hits[key] = (distance, self.hit_lengths(key[0], key[1], distance))
+
+        return [bisect_right(hits[(tuple(your_position), tuple(trainer_position))][1],
+                             distance * distance)
+                for your_position, trainer_position, distance in scenarios]
+
+    def get_pool(self, processes):
+        if self.pool is None or self.processes != processes:
+            self.close()
+            self.pool = Pool(processes)
+            self.processes = processes
+        return self.pool
+
+    def close(self):
+        """Shuts down the worker pool, if one was started."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+def split_jobs(missing, processes):
+    """Splits the missing pairs into one job per shooter, or into up to
+    `processes` jobs per shooter when there are fewer shooters than that.
+
+    Examples:
+    >>> split_jobs({(1, 1): [((2, 1), 4), ((2, 2), 4)]}, 2)
+    [((1, 1), [((2, 1), 4)]), ((1, 1), [((2, 2), 4)])]
+    """
+    parts = max(1, processes // len(missing))
+    jobs = []
+    for shooter, pairs in missing.items():
+        size = -(-len(pairs) // parts)
+        jobs.extend((shooter, pairs[i:i + size])
+                    for i in range(0, len(pairs), size))
+    return jobs
+
+
+def shooter_lengths(job):
+    """Pool worker: the hitting beam lengths for each trainer of one
+    shooter, sharing the shooter's nearest images between them.
+    """
+    dimensions, shooter, pairs = job
+    blockers = nearest_images(dimensions, shooter,
+                              max(distance for _, distance in pairs))
+    return [(trainer, (distance, pair_lengths(dimensions, shooter, trainer,
+                                              distance, blockers)))
+            for trainer, distance in pairs]
+
+
+def nearest_images(dimensions, your_position, distance):
+    """Maps each direction to the squared length of the nearest image of
+    the shooter along it, as `lattice_solution` keys directions.
+
+    Returns None when the table would hold more than MAX_SHOOTER_IMAGES
+    entries.
+
+    Examples:
+    >>> sorted(nearest_images([3, 2], [1, 1], 3).items())
+    [((-1, -1), 8), ((-1, 0), 4), ((-1, 1), 8), ((0, -1), 4), ((0, 1), 4)]
+    """
+    width, height = dimensions
+    if pi * distance * distance / (width * height) > MAX_SHOOTER_IMAGES:
+        return None
+    nearest = {}
+    for dx, dy in mirrored_offsets(dimensions, your_position, your_position,
+                                   distance):
+        a, b = abs(dx), abs(dy)
+        while b:
+            a, b = b, a % b
+        if a == 0:
+            continue
+        direction = (dx // a, dy // a)
+        delta_sq = dx * dx + dy * dy
+        if delta_sq < nearest.get(direction, delta_sq + 1):
+            nearest[direction] = delta_sq
+    return nearest
+
+
+def pair_lengths(dimensions, your_position, trainer_position, distance, blockers):
+    """Returns the sorted squared lengths of every beam that hits the
+    trainer within `distance`.
+
+    Args:
+        dimensions (List[int]): The width and height of the room.
+        your_position (List[int]): Your x and y coordinates in the room.
+        trainer_position (List[int]): The trainer's x and y coordinates.
+        distance (int): The maximum distance the beam can travel.
+        blockers (Optional[Dict[Tuple[int, int], int]]): The shooter's
+            `nearest_images` for at least `distance`. If None, each trainer
+            image is checked with `hitting_offsets` instead.
+
+    Examples:
+    >>> pair_lengths([3, 2], [1, 1], [2, 1], 4,
+    ...              nearest_images([3, 2], [1, 1], 4))
+    [1, 5, 5, 13, 13, 13, 13]
+    >>> pair_lengths([3, 2], [1, 1], [2, 1], 4, None)
+    [1, 5, 5, 13, 13, 13, 13]
+    """
+    if blockers is None:
+        return sorted(dx * dx + dy * dy for dx, dy in hitting_offsets(
+            dimensions, your_position, trainer_position, distance))
+    if tuple(your_position) == tuple(trainer_position):
+        return []
+
+    nearest = {}
+    for dx, dy in mirrored_offsets(dimensions, your_position, trainer_position,
+                                   distance):
+        a, b = abs(dx), abs(dy)
+        while b:
+            a, b = b, a % b
+        direction = (dx // a, dy // a)
+        delta_sq = dx * dx + dy * dy
+        if delta_sq < nearest.get(direction, delta_sq + 1):
+            nearest[direction] = delta_sq
+    return sorted(delta_sq for direction, delta_sq in nearest.items()
+                  if delta_sq < blockers.get(direction, delta_sq + 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dimensions', type=int, nargs=2, default=[300, 275])
+    parser.add_argument('--scenarios', type=int, default=10000)
+    parser.add_argument('--shooters', type=int, default=10)
+    parser.add_argument('--pairs', type=int, default=200)
+    parser.add_argument('--max-distance', type=int, default=5000)
+    parser.add_argument('--processes', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    width, height = args.dimensions
+    shooters = [[rng.randint(1, width - 1), rng.randint(1, height - 1)]
+                for _ in range(args.shooters)]
+    pairs = []
+    while len(pairs) < args.pairs:
+        you = rng.choice(shooters)
+        trainer = [rng.randint(1, width - 1), rng.randint(1, height - 1)]
+        if you != trainer:
+            pairs.append((you, trainer))
+    scenarios = [rng.choice(pairs) + (rng.randint(2, args.max_distance),)
+                 for _ in range(args.scenarios)]
+
+    room = Room(args.dimensions, max_pairs=max(256, args.pairs))
+    try:
+        start = time.time()
+        room.count_directions_batch(scenarios, args.processes)
+        elapsed = time.time() - start
+    finally:
+        room.close()
+    print('%d scenarios over %d pairs and %d shooters in %.2fs: '
+          '%.1f scenarios/s' % (len(scenarios), len(pairs), len(shooters),
+                                elapsed, len(scenarios) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
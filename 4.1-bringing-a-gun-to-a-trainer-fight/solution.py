@@ -1,5 +1,8 @@
 from itertools import product
-from math import atan2
+from math import atan2, sqrt
+
+# Reflections generated by getReflections, counted while this is a dict.
+STATS = None
 
 
 def solution(dimensions, your_position, trainer_position, distance):
@@ -83,5 +86,190 @@ def getReflections(dimensions, position, rooms_up, rooms_out):
     reflections += [(-x,y) for x,y in reflections]
     reflections += [(x,-y) for x,y in reflections]
 
+    if STATS is not None:
+        STATS['reflections'] += len(reflections)
     return reflections
 
+
+def lattice_solution(dimensions, your_position, trainer_position, distance):
+    """Counts the directions you can fire in to hit the trainer, exactly.
+
+    Unfolding the reflections turns every bounced beam into a straight line
+    to a mirrored copy of you or the trainer. Each direction is keyed by its
+    gcd-reduced integer vector, so two images on the same ray always share
+    a key without any floating-point rounding. A direction counts if the
+    nearest image along it is a trainer: a nearer image of yourself means
+    the beam hits you first.
+
+    Mirrored positions are generated lazily, column by column, and only
+    inside the circle the beam can reach.
+
+    Args:
+        dimensions (List[int]): The width and height of the room.
+        your_position (List[int]): Your x and y coordinates in the room.
+        trainer_position (List[int]): The trainer's x and y coordinates.
+        distance (int): The maximum distance the beam can travel.
+
+    Returns:
+        int: The number of distinct directions that hit the trainer.
+
+    Examples:
+    >>> lattice_solution([3, 2], [1, 1], [2, 1], 4)
+    7
+    >>> lattice_solution([300, 275], [150, 150], [185, 100], 500)
+    9
+    """
+    # nearest[direction]: the squared distance of the nearest image along
+    # `direction` and whether that image is the trainer.
+    nearest = {}
+    for is_trainer, position in ((False, your_position), (True, trainer_position)):
+        for dx, dy in mirrored_offsets(dimensions, your_position, position, distance):
+            # Inlined Euclid; a call to fractions.gcd per image dominates
+            # the run time otherwise.
+            a, b = abs(dx), abs(dy)
+            while b:
+                a, b = b, a % b
+            if a == 0:
+                continue
+            direction = (dx // a, dy // a)
+            delta_sq = dx * dx + dy * dy
+            best = nearest.get(direction)
+            if best is None or delta_sq < best[0]:
+                nearest[direction] = (delta_sq, is_trainer)
+
+    return sum(1 for _, is_trainer in nearest.values() if is_trainer)
+
+
+def streaming_solution(dimensions, your_position, trainer_position, distance):
+    """Counts the directions you can fire in to hit the trainer, in constant
+    memory.
+
+    Same unfolding as `lattice_solution`, but instead of remembering the
+    nearest image per direction, each trainer image at `g * (p, q)`, with
+    `(p, q)` reduced, checks directly whether any of the lattice points
+    `k * (p, q)` for `0 < k < g` is itself an image of you or the trainer.
+    The images are streamed from `mirrored_offsets` and nothing is kept
+    between them, so memory stays flat however many mirrored rooms the
+    beam reaches. The gcd of a lattice point is small on average, so the
+    check costs a few modulo operations per image.
+
+    Args:
+        dimensions (List[int]): The width and height of the room.
+        your_position (List[int]): Your x and y coordinates in the room.
+        trainer_position (List[int]): The trainer's x and y coordinates.
+        distance (int): The maximum distance the beam can travel.
+
+    Returns:
+        int: The number of distinct directions that hit the trainer.
+
+    Examples:
+    >>> streaming_solution([3, 2], [1, 1], [2, 1], 4)
+    7
+    >>> streaming_solution([300, 275], [150, 150], [185, 100], 500)
+    9
+    """
+    return sum(1 for _ in hitting_offsets(dimensions, your_position,
+                                          trainer_position, distance))
+
+
+def hitting_offsets(dimensions, your_position, trainer_position, distance):
+    """Yields one offset per direction that hits the trainer, without
+    remembering earlier images. See `streaming_solution`.
+
+    Yields:
+        Tuple[int, int]: The (dx, dy) offset to the nearest trainer image
+            along each direction that hits the trainer.
+
+    Examples:
+    >>> sorted(hitting_offsets([3, 2], [1, 1], [2, 1], 3))
+    [(1, -2), (1, 0), (1, 2)]
+    >>> list(hitting_offsets([3, 2], [1, 1], [1, 1], 3))
+    []
+    """
+    if list(your_position) == list(trainer_position):
+        # Every trainer image is then an image of you as well, which the
+        # beam reaches just as soon, as in `lattice_solution`.
+        return
+
+    x, y = your_position
+    period_x, period_y = 2 * dimensions[0], 2 * dimensions[1]
+    # The residues that mirrored copies of you and the trainer take in each
+    # axis, modulo twice the room size.
+    images = [(set([px % period_x, -px % period_x]), set([py % period_y, -py % period_y]))
+              for px, py in (your_position, trainer_position)]
+
+    for dx, dy in mirrored_offsets(dimensions, your_position, trainer_position, distance):
+        a, b = abs(dx), abs(dy)
+        while b:
+            a, b = b, a % b
+        if a == 0:
+            # The zero-length offset to an image at your own position.
+            continue
+        p, q = dx // a, dy // a
+        for k in range(1, a):
+            ix, iy = (x + k * p) % period_x, (y + k * q) % period_y
+            if any(ix in xs and iy in ys for xs, ys in images):
+                break
+        else:
+            yield dx, dy
+
+
+def mirrored_offsets(dimensions, origin, position, distance):
+    """Yields the offsets from `origin` to every mirrored copy of `position`
+    within `distance`.
+
+    Args:
+        dimensions (List[int]): The width and height of the room.
+        origin (List[int]): The point offsets are measured from.
+        position (List[int]): The point being mirrored.
+        distance (int): The largest offset length to yield.
+
+    Yields:
+        Tuple[int, int]: (dx, dy) offsets with dx**2 + dy**2 <= distance**2.
+
+    Examples:
+    >>> sorted(mirrored_offsets([3, 2], [1, 1], [2, 1], 3))
+    [(-3, 0), (1, -2), (1, 0), (1, 2), (3, 0)]
+    """
+    radius_squared = distance * distance
+    for ix in mirrored_coordinates(position[0], dimensions[0],
+                                   origin[0] - distance, origin[0] + distance):
+        dx = ix - origin[0]
+        span = isqrt(radius_squared - dx * dx)
+        for iy in mirrored_coordinates(position[1], dimensions[1],
+                                       origin[1] - span, origin[1] + span):
+            yield dx, iy - origin[1]
+
+
+def mirrored_coordinates(p, size, low, high):
+    """Yields every mirrored copy `2 * k * size +/- p` of a coordinate that
+    falls within [low, high].
+
+    Examples:
+    >>> sorted(mirrored_coordinates(1, 3, -6, 6))
+    [-5, -1, 1, 5]
+    """
+    for k in range((low - size) // (2 * size), (high + size) // (2 * size) + 1):
+        for c in (2 * k * size - p, 2 * k * size + p):
+            if low <= c <= high:
+                yield c
+
+
+def isqrt(n):
+    """Returns the largest integer whose square does not exceed `n`.
+
+    Examples:
+    >>> isqrt(24), isqrt(25), isqrt(10 ** 30)
+    (4, 5, 1000000000000000)
+    """
+    r = int(sqrt(n))
+    while r * r > n:
+        r -= 1
+    while (r + 1) * (r + 1) <= n:
+        r += 1
+    return r
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,168 @@
+"""Benchmark for the Escape Pods max-flow engines.
+
+Times every engine in `ENGINES`, and the one `choose_engine` picks, on
+generated graph families:
+
+  - grid:      a square grid of rooms, sources on the left edge and sinks
+               on the right, with corridors both ways between neighbours;
+  - layered:   ten layers of rooms, each room with a few corridors into
+               the next layer;
+  - random:    a few corridors out of every room to any other room;
+  - bipartite: sources fully joined to a middle layer that is sparsely
+               joined to the sinks.
+
+Every run happens in a fresh worker process, whose peak resident memory
+above the graph itself is reported. `dense_solution` is timed too, on the
+capacity matrix, up to `--dense-limit` rooms.
+
+Usage:
+
+    python benchmark.py [--sizes 1000 10000] [--families grid layered random bipartite]
+"""
+import argparse
+import random
+import resource
+import time
+from multiprocessing import Pool
+
+from solution import ENGINES, choose_engine, dense_solution, edge_list_solution
+
+
+def generate_graph(num_nodes, degree=4, layers=10, seed=0):
+    """Builds random layered corridors from the first layer to the last.
+
+    Returns:
+        Tuple[List[int], List[int], List[Tuple[int, int, int]]]: The
+            sources, the sinks and the (from, to, capacity) corridors.
+    """
+    rng = random.Random(seed)
+    width = max(1, num_nodes // layers)
+    edges = []
+    for u in range(num_nodes - width):
+        layer_end = (u // width + 2) * width
+        for _ in range(degree):
+            v = rng.randrange(layer_end - width, min(layer_end, num_nodes))
+            edges.append((u, v, rng.randint(1, 100)))
+    sources = list(range(width))
+    sinks = list(range((layers - 1) * width, num_nodes))
+    return sources, sinks, edges
+
+
+def grid_graph(num_nodes, degree=4, seed=0):
+    """Builds a square grid with corridors both ways between neighbours."""
+    rng = random.Random(seed)
+    side = max(2, int(num_nodes ** 0.5))
+    edges = []
+    for row in range(side):
+        for column in range(side):
+            u = row * side + column
+            if column + 1 < side:
+                edges.append((u, u + 1, rng.randint(1, 100)))
+                edges.append((u + 1, u, rng.randint(1, 100)))
+            if row + 1 < side:
+                edges.append((u, u + side, rng.randint(1, 100)))
+                edges.append((u + side, u, rng.randint(1, 100)))
+    sources = [row * side for row in range(side)]
+    sinks = [row * side + side - 1 for row in range(side)]
+    return sources, sinks, edges
+
+
+def random_graph(num_nodes, degree=4, seed=0):
+    """Builds `degree` corridors out of every room to random other rooms."""
+    rng = random.Random(seed)
+    edges = []
+    for u in range(num_nodes):
+        for _ in range(degree):
+            v = rng.randrange(num_nodes - 1)
+            edges.append((u, v + (v >= u), rng.randint(1, 100)))
+    ends = max(1, num_nodes // 100)
+    return list(range(ends)), list(range(num_nodes - ends, num_nodes)), edges
+
+
+def bipartite_graph(num_nodes, degree=4, seed=0):
+    """Builds sources fully joined to a middle layer, which is sparsely
+    joined to the sinks."""
+    rng = random.Random(seed)
+    ends = max(1, int(num_nodes ** 0.5) // 2)
+    middle = range(ends, num_nodes - ends)
+    sinks = list(range(num_nodes - ends, num_nodes))
+    edges = [(s, v, rng.randint(1, 100)) for s in range(ends) for v in middle]
+    for v in middle:
+        for _ in range(degree):
+            edges.append((v, rng.choice(sinks), rng.randint(1, 100)))
+    return list(range(ends)), sinks, edges
+
+
+FAMILIES = {
+    'grid': grid_graph,
+    'layered': generate_graph,
+    'random': random_graph,
+    'bipartite': bipartite_graph,
+}
+
+
+def dense_matrix(num_nodes, edges):
+    capacity = [[0] * num_nodes for _ in range(num_nodes)]
+    for u, v, c in edges:
+        capacity[u][v] += c
+    return capacity
+
+
+def measure(job):
+    """Runs one engine on one generated graph, in a worker process.
+
+    Returns:
+        Tuple[float, int, int]: The seconds taken, the peak resident memory
+            in KB above that of the graph, and the maximum flow.
+    """
+    family, num_nodes, degree, engine = job
+    sources, sinks, edges = FAMILIES[family](num_nodes, degree)
+    if engine == 'dense':
+        capacity = dense_matrix(num_nodes, edges)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    if engine == 'dense':
+        flow = dense_solution(sources, sinks, capacity)
+    else:
+        flow = edge_list_solution(sources, sinks, edges, num_nodes, engine)
+    elapsed = time.time() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+    return elapsed, peak, flow
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--families', nargs='+', default=sorted(FAMILIES))
+    parser.add_argument('--degree', type=int, default=4)
+    parser.add_argument('--dense-limit', type=int, default=300)
+    args = parser.parse_args()
+
+    engines = sorted(ENGINES)
+    print('%10s %8s %18s %10s %10s %12s' % (
+        'family', 'rooms', 'engine', 'time (s)', 'peak (KB)', 'max flow'))
+    for family in args.families:
+        for num_nodes in args.sizes:
+            sources, sinks, edges = FAMILIES[family](num_nodes, args.degree)
+            chosen = choose_engine(num_nodes, edges, sources, sinks)
+            runs = engines + (['dense'] if num_nodes <= args.dense_limit else [])
+            flows = set()
+            for engine in runs:
+                # A fresh process per run keeps peak memory readings apart.
+                pool = Pool(1, maxtasksperchild=1)
+                try:
+                    elapsed, peak, flow = pool.apply(
+                        measure, ((family, num_nodes, args.degree, engine),))
+                finally:
+                    pool.close()
+                    pool.join()
+                flows.add(flow)
+                print('%10s %8d %18s %10.3f %10d %12d' % (
+                    family, num_nodes,
+                    engine + (' (auto)' if engine == chosen else ''),
+                    elapsed, peak, flow))
+            assert len(flows) == 1, 'Engines disagree on the maximum flow'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+"""Stateful Escape Pods network that re-solves incrementally.
+
+`EscapePodNetwork` keeps its flow and residual graph between queries.
+When a corridor's capacity changes, only the affected flow is repaired:
+
+  - a higher capacity just opens residual room, so the network goes
+    looking for new augmenting paths;
+  - a lower capacity below the current flow takes the overflow `d` off
+    that corridor, which leaves `d` bunnies stranded at its start room
+    and `d` missing at its end room. The stranded bunnies are first
+    rerouted to the end room through other corridors, and whatever cannot
+    be rerouted is sent back to the sources and taken away from the
+    sinks.
+
+Augmenting uses Dinic's blocking flows, starting from whichever rooms need
+them, so after a small edit only the region around the edit and the
+paths it touches are searched again.
+
+Usage:
+
+    python network.py [--rooms 10000] [--updates 200]
+"""
+import argparse
+import random
+import time
+from collections import deque
+
+from solution import edge_list_solution
+
+
+class EscapePodNetwork(object):
+    """Maximum flow from sources to sinks under corridor capacity edits.
+
+    Every corridor pair u -> v and v -> u shares a pair of arcs `a` and
+    `a ^ 1`, so the flow on one is minus the flow on the other.
+
+    Examples:
+    >>> network = EscapePodNetwork([0], [3], [(0, 1, 7), (1, 2, 6), (2, 3, 8), (3, 0, 9)])
+    >>> network.max_flow()
+    6
+    >>> network.update_capacity(1, 2, 3)
+    3
+    >>> network.min_cut()
+    ([0, 1], [(1, 2)])
+    >>> network.update_capacity(0, 2, 4)
+    7
+    """
+
+    def __init__(self, sources, sinks, edges, num_nodes=None):
+        """
+        Args:
+            sources (List[int]): The starting room numbers.
+            sinks (List[int]): The escape pod room numbers.
+            edges (List[Tuple[int, int, int]]): (from, to, capacity) for
+                every corridor direction. Repeated corridors add up.
+            num_nodes (int, optional): The number of rooms. Defaults to one
+                more than the largest room number mentioned.
+        """
+        if num_nodes is None:
+            num_nodes = 1 + max([max(u, v) for u, v, _ in edges] + sources + sinks)
+        self.num_nodes = num_nodes
+        self.sources = list(sources)
+        self.sinks = list(sinks)
+        self.terminals = set(sources) | set(sinks)
+        self.arcs = [[] for _ in range(num_nodes)]
+        self.head = []
+        self.capacity = []
+        self.residual = []
+        self.arc_index = {}
+
+        for u, v, c in edges:
+            if u != v:
+                a = self.arc(u, v)
+                self.capacity[a] += c
+                self.residual[a] += c
+        self.augment(self.sources, self.sinks)
+
+    @classmethod
+    def from_matrix(cls, sources, sinks, capacity):
+        """Builds a network from a capacity matrix.
+
+        Examples:
+        >>> EscapePodNetwork.from_matrix([0], [2], [[0, 4, 0], [0, 0, 5], [0, 0, 0]]).max_flow()
+        4
+        """
+        edges = [(u, v, c) for u, row in enumerate(capacity)
+                 for v, c in enumerate(row) if c > 0]
+        return cls(sources, sinks, edges, len(capacity))
+
+    def arc(self, u, v):
+        """Returns the arc for u -> v, adding an empty arc pair if needed."""
+        a = self.arc_index.get((u, v))
+        if a is None:
+            a = len(self.head)
+            self.head.extend([v, u])
+            self.capacity.extend([0, 0])
+            self.residual.extend([0, 0])
+            self.arcs[u].append(a)
+            self.arcs[v].append(a ^ 1)
+            self.arc_index[(u, v)] = a
+            self.arc_index[(v, u)] = a ^ 1
+        return a
+
+    def max_flow(self):
+        """Returns the current flow into the sinks."""
+        return sum(self.residual[a] - self.capacity[a]
+                   for t in self.sinks for a in self.arcs[t])
+
+    def update_capacity(self, u, v, c):
+        """Sets the capacity of the corridor from `u` to `v` and re-solves.
+
+        Args:
+            u (int): The room the corridor starts at.
+            v (int): The room the corridor leads to.
+            c (int): The new capacity.
+
+        Returns:
+            int: The new maximum flow.
+
+        Raises:
+            ValueError: If the capacity is negative or u == v.
+        """
+        if c < 0:
+            raise ValueError("Capacity must be non-negative")
+        if u == v:
+            raise ValueError("A corridor must join two different rooms")
+
+        a = self.arc(u, v)
+        self.residual[a] += c - self.capacity[a]
+        self.capacity[a] = c
+        overflow = -self.residual[a]
+        if overflow > 0:
+            self.residual[a] = 0
+            self.residual[a ^ 1] -= overflow
+            self.repair(u, v, overflow)
+
+        self.augment(self.sources, self.sinks)
+        return self.max_flow()
+
+    def repair(self, u, v, overflow):
+        """Restores conservation after `overflow` was taken off u -> v.
+
+        Sources and sinks absorb any imbalance; other rooms have it rerouted
+        to `v` where possible and cancelled back to the terminals otherwise.
+        """
+        stranded = overflow if u not in self.terminals else 0
+        missing = overflow if v not in self.terminals else 0
+        if stranded and missing:
+            rerouted = self.augment([u], [v], overflow)
+            stranded -= rerouted
+            missing -= rerouted
+        if stranded:
+            self.augment([u], self.sources, stranded)
+        if missing:
+            self.augment(self.sinks, [v], missing)
+
+    def levels(self, starts, targets):
+        """Breadth-first distances over the residual graph from `starts`.
+
+        Returns:
+            Optional[Dict[int, int]]: The distance of every room reached,
+                without searching past targets, or None if no target is
+                reachable.
+        """
+        level = dict.fromkeys(starts, 0)
+        queue = deque(starts)
+        found = False
+        while queue:
+            x = queue.popleft()
+            if x in targets:
+                found = True
+                continue
+            for a in self.arcs[x]:
+                w = self.head[a]
+                if self.residual[a] > 0 and w not in level:
+                    level[w] = level[x] + 1
+                    queue.append(w)
+        return level if found else None
+
+    def augment(self, starts, targets, limit=None):
+        """Sends flow from `starts` to `targets` along residual paths.
+
+        Args:
+            starts (List[int]): The rooms flow leaves from.
+            targets (List[int]): The rooms flow may end at.
+            limit (int, optional): The most flow to send. Defaults to as
+                much as possible.
+
+        Returns:
+            int: The flow sent.
+        """
+        targets = set(targets)
+        head = self.head
+        residual = self.residual
+        total = 0
+        while limit is None or total < limit:
+            level = self.levels(starts, targets)
+            if level is None:
+                break
+            # current[x]: the next arc of x still worth trying this phase.
+            current = {}
+            for s in starts:
+                path = []
+                x = s
+                while limit is None or total < limit:
+                    if x in targets:
+                        pushed = min(residual[a] for a in path)
+                        if limit is not None:
+                            pushed = min(pushed, limit - total)
+                        for a in path:
+                            residual[a] -= pushed
+                            residual[a ^ 1] += pushed
+                        total += pushed
+                        path = []
+                        x = s
+                        continue
+
+                    arcs = self.arcs[x]
+                    i = current.get(x, 0)
+                    next_level = level.get(x, -2) + 1
+                    while i < len(arcs) and not (
+                            residual[arcs[i]] > 0
+                            and level.get(head[arcs[i]]) == next_level):
+                        i += 1
+                    current[x] = i
+                    if i < len(arcs):
+                        path.append(arcs[i])
+                        x = head[arcs[i]]
+                    else:
+                        # A dead end for the rest of this phase.
+                        level.pop(x, None)
+                        if not path:
+                            break
+                        x = head[path.pop() ^ 1]
+                        current[x] += 1
+        return total
+
+    def min_cut(self):
+        """Reads a minimum cut off the current residual graph.
+
+        Returns:
+            Tuple[List[int], List[Tuple[int, int]]]: The rooms still
+                reachable from the sources, and the corridors leading out of
+                them, whose capacities add up to the maximum flow.
+        """
+        reached = set(self.sources)
+        queue = deque(self.sources)
+        while queue:
+            x = queue.popleft()
+            for a in self.arcs[x]:
+                w = self.head[a]
+                if self.residual[a] > 0 and w not in reached:
+                    reached.add(w)
+                    queue.append(w)
+
+        cut = [(u, self.head[a]) for u in reached for a in self.arcs[u]
+               if self.capacity[a] > 0 and self.head[a] not in reached]
+        return sorted(reached), sorted(cut)
+
+
+def main():
+    from benchmark import generate_graph
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rooms', type=int, default=10000)
+    parser.add_argument('--degree', type=int, default=4)
+    parser.add_argument('--updates', type=int, default=200)
+    parser.add_argument('--check-every', type=int, default=50)
+    args = parser.parse_args()
+
+    sources, sinks, edges = generate_graph(args.rooms, args.degree)
+    start = time.time()
+    network = EscapePodNetwork(sources, sinks, edges, args.rooms)
+    cold = time.time() - start
+
+    rng = random.Random(1)
+    capacities = dict(((u, v), 0) for u, v, _ in edges)
+    for u, v, c in edges:
+        capacities[(u, v)] += c
+    corridors = sorted(capacities)
+    elapsed = 0
+    for i in range(1, args.updates + 1):
+        corridor = rng.choice(corridors)
+        capacities[corridor] = rng.randint(0, 100)
+        start = time.time()
+        flow = network.update_capacity(corridor[0], corridor[1], capacities[corridor])
+        elapsed += time.time() - start
+        if i % args.check_every == 0:
+            expected = edge_list_solution(
+                sources, sinks, [k + (c,) for k, c in capacities.items()],
+                args.rooms)
+            assert flow == expected, 'Incremental flow differs from a cold solve'
+
+    print('cold solve:  %10.4fs' % cold)
+    print('update:      %10.4fs on average over %d updates' % (
+        elapsed / args.updates, args.updates))
+    print('speedup:     %9.1fx' % (cold * args.updates / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,22 @@
-import doctest
+from collections import deque
+
+# Corridors per room from which `choose_engine` treats a graph as dense.
+DENSE_DEGREE = 8
+# The most corridors from a source to the nearest sink for which
+# `choose_engine` treats a sparse graph as shallow.
+SHALLOW_DEPTH = 4
+# Max-flow step counts by name, and how often each engine ran as
+# `engine_<name>`, kept while this is a dict.
+STATS = None
 
 
 def solution(sources, sinks, capacity):
     """
     Calculates how many bunnies can safely make it to the escape pods at a
-    time at peak using the the push-relabel maximum flow algorithm.
+    time at peak, with the maximum flow engine `choose_engine` picks.
+
+    Only the corridors that exist are looked at: the matrix is turned into
+    an edge list and solved with `edge_list_solution`.
 
     Args:
         sources (List[int]):
@@ -24,14 +36,568 @@ def solution(sources, sinks, capacity):
     >>> solution([0, 1], [4, 5], [[0, 0, 4, 6, 0, 0], [0, 0, 5, 2, 0, 0], [0, 0, 0, 0, 4, 4], [0, 0, 0, 0, 6, 6], [0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0]])
     16
     """
+    edges = [(u, v, c) for u, row in enumerate(capacity)
+             for v, c in enumerate(row) if c > 0 and u != v]
+    return edge_list_solution(sources, sinks, edges, len(capacity))
+
+
+def edge_list_solution(sources, sinks, edges, num_nodes=None, engine=None):
+    """
+    Calculates how many bunnies can safely make it to the escape pods at a
+    time at peak, given the corridors as an edge list.
+
+    Args:
+        sources (List[int]):
+            The starting room numbers of the groups of bunnies.
+        sinks (List[int]):
+            The room numbers of the escape pods.
+        edges (List[Tuple[int, int, int]]):
+            (from_room, to_room, capacity) for every corridor direction.
+            Repeated corridors add up.
+        num_nodes (int, optional):
+            The number of rooms. Defaults to one more than the largest room
+            number mentioned.
+        engine (str, optional):
+            One of `ENGINES`. Defaults to the one `choose_engine` picks.
+
+    Returns:
+        int: The total number of bunnies that can get through at each time step.
+
+    Examples:
+    >>> edge_list_solution([0], [3], [(0, 1, 7), (1, 2, 6), (2, 3, 8), (3, 0, 9)])
+    6
+    >>> edge_list_solution([0], [3], [(0, 1, 7), (1, 2, 6), (2, 3, 8)], engine='dinic')
+    6
+    """
+    if num_nodes is None:
+        num_nodes = 1 + max([max(u, v) for u, v, _ in edges] + sources + sinks)
+    if engine is None:
+        engine = choose_engine(num_nodes, edges, sources, sinks)
+    if STATS is not None:
+        STATS['engine_' + engine] += 1
+    return ENGINES[engine](num_nodes, edges, sources, sinks)
+
+
+def build_residual_graph(num_nodes, edges):
+    """
+    Lays out a residual graph in compressed sparse row (CSR) form.
+
+    Every edge gets a paired reverse edge with no capacity of its own. The
+    arcs leaving node `v` are `first[v]` up to but excluding `first[v + 1]`.
+
+    Args:
+        num_nodes (int): The number of nodes.
+        edges (List[Tuple[int, int, int]]): (from, to, capacity) triples.
+
+    Returns:
+        Tuple[List[int], List[int], List[int], List[int]]: `first`, then the
+            head, residual capacity and paired reverse arc of every arc.
+
+    Examples:
+    >>> build_residual_graph(2, [(0, 1, 5)])
+    ([0, 1, 2], [1, 0], [5, 0], [1, 0])
+    """
+    degree = [0] * num_nodes
+    for u, v, _ in edges:
+        degree[u] += 1
+        degree[v] += 1
+
+    first = [0] * (num_nodes + 1)
+    for v in range(num_nodes):
+        first[v + 1] = first[v] + degree[v]
+
+    num_arcs = first[num_nodes]
+    head = [0] * num_arcs
+    residual = [0] * num_arcs
+    reverse = [0] * num_arcs
+    position = first[:num_nodes]
+    for u, v, c in edges:
+        a = position[u]
+        position[u] += 1
+        b = position[v]
+        position[v] += 1
+        head[a], residual[a], reverse[a] = v, c, b
+        head[b], residual[b], reverse[b] = u, 0, a
+
+    return first, head, residual, reverse
+
+
+def build_flow_graph(num_nodes, edges, sources, sinks):
+    """
+    Builds the residual graph with a super source and super sink.
+
+    The super source is node `num_nodes` and feeds every source; every sink
+    drains into the super sink, node `num_nodes + 1`. Their arcs can carry
+    more than all the corridors together.
+
+    Returns:
+        Tuple[int, int, List[int], List[int], List[int], List[int]]: The
+            super source, the super sink, then the CSR arrays from
+            `build_residual_graph`.
+    """
+    infinite = sum(c for _, _, c in edges) + 1
+    source, sink = num_nodes, num_nodes + 1
+    all_edges = (list(edges)
+                 + [(source, s, infinite) for s in sources]
+                 + [(t, sink, infinite) for t in sinks])
+    return (source, sink) + build_residual_graph(num_nodes + 2, all_edges)
+
+
+def push_relabel(num_nodes, edges, sources, sinks):
+    """
+    Calculates the maximum flow from `sources` to `sinks` on a sparse graph.
+
+    FIFO push-relabel on a CSR residual graph, with a super source and super
+    sink joined to every source and sink. Two heuristics keep the number of
+    relabels down:
+      - global relabeling: every `num_nodes` relabels, heights are reset to
+        exact distances to the sink with a backwards breadth-first search;
+      - gap relabeling: when no node is left at some height below
+        `num_nodes`, every node above that height can no longer reach the
+        sink and is lifted out of the way. Nodes are listed per height, so
+        a gap only touches the nodes above it.
+
+    Only the maximum preflow is computed, since its value is the maximum
+    flow, so nodes that cannot reach the sink are simply left alone.
+
+    Args:
+        num_nodes (int): The number of rooms.
+        edges (List[Tuple[int, int, int]]): (from, to, capacity) triples.
+        sources (List[int]): The starting room numbers.
+        sinks (List[int]): The escape pod room numbers.
+
+    Returns:
+        int: The value of the maximum flow.
+
+    Examples:
+    >>> push_relabel(4, [(0, 1, 3), (0, 2, 2), (1, 2, 5), (1, 3, 2), (2, 3, 3)], [0], [3])
+    5
+    """
+    source, sink, first, head, residual, reverse = build_flow_graph(
+        num_nodes, edges, sources, sinks)
+    n = num_nodes + 2
+
+    height = [0] * n
+    excess = [0] * n
+    current = first[:n]
+    # count[h]: how many nodes are at height h below n, for the gap heuristic.
+    count = [0] * n
+    # bucket[h]: the nodes placed at height h below n since the last global
+    # relabel. Entries go stale when a node moves up and are skipped.
+    bucket = [[] for _ in range(n)]
+    # top[0]: an upper bound on the highest height below n in use.
+    top = [0]
+    active = deque()
+    in_queue = [False] * n
+    # Relabels since the last global relabel.
+    relabels = [0]
+    stats = STATS
+
+    def global_relabel():
+        if stats is not None:
+            stats['global_relabel'] += 1
+        for v in range(n):
+            height[v] = n
+            current[v] = first[v]
+        for h in range(top[0] + 1):
+            count[h] = 0
+            del bucket[h][:]
+        height[sink] = 0
+        queue = deque([sink])
+        while queue:
+            w = queue.popleft()
+            bucket[height[w]].append(w)
+            count[height[w]] += 1
+            for e in range(first[w], first[w + 1]):
+                v = head[e]
+                # v -> w has residual capacity iff the pair of e does.
+                if height[v] == n and v != source and residual[reverse[e]] > 0:
+                    height[v] = height[w] + 1
+                    queue.append(v)
+        top[0] = height[w]
+
+    def enqueue(v):
+        if not in_queue[v] and v != source and v != sink and height[v] < n:
+            in_queue[v] = True
+            active.append(v)
+
+    def push(e, v, w):
+        if stats is not None:
+            stats['push'] += 1
+        delta = min(excess[v], residual[e])
+        residual[e] -= delta
+        residual[reverse[e]] += delta
+        excess[v] -= delta
+        excess[w] += delta
+        enqueue(w)
+
+    def relabel(v):
+        if stats is not None:
+            stats['relabel'] += 1
+        old = height[v]
+        min_height = 2 * n
+        for e in range(first[v], first[v + 1]):
+            if residual[e] > 0:
+                min_height = min(min_height, height[head[e]])
+        count[old] -= 1
+        new = height[v] = min(min_height + 1, 2 * n)
+        if new < n:
+            count[new] += 1
+            bucket[new].append(v)
+            if new > top[0]:
+                top[0] = new
+        current[v] = first[v]
+        relabels[0] += 1
+
+        if count[old] == 0:
+            # Nothing is left at `old`, so nothing above it reaches the
+            # sink, `v` included. Only the buckets above the gap are read.
+            if stats is not None:
+                stats['gap'] += 1
+            for h in range(old + 1, top[0] + 1):
+                for u in bucket[h]:
+                    if height[u] == h:
+                        height[u] = n
+                count[h] = 0
+                del bucket[h][:]
+            top[0] = old - 1
+
+    def discharge(v):
+        if stats is not None:
+            stats['discharge'] += 1
+        end = first[v + 1]
+        while excess[v] > 0 and height[v] < n:
+            e = current[v]
+            if e == end:
+                relabel(v)
+                continue
+            w = head[e]
+            if residual[e] > 0 and height[v] == height[w] + 1:
+                push(e, v, w)
+            else:
+                current[v] += 1
+
+    for e in range(first[source], first[source + 1]):
+        excess[source] += residual[e]
+        push(e, source, head[e])
+
+    global_relabel()
+    while active:
+        v = active.popleft()
+        in_queue[v] = False
+        discharge(v)
+        if relabels[0] >= num_nodes:
+            # Heights never overestimate the distance to the sink, so no
+            # node comes back below n here: the active ones stay queued.
+            relabels[0] = 0
+            global_relabel()
+
+    return excess[sink]
+
+
+def dinic(num_nodes, edges, sources, sinks):
+    """
+    Calculates the maximum flow from `sources` to `sinks` with Dinic's
+    algorithm.
+
+    Each phase labels nodes with their breadth-first distance from the
+    source and then saturates every shortest path at once with a blocking
+    flow. A current-arc pointer per node skips arcs already found useless
+    in the phase, so each phase costs O(nodes * arcs) at most. The number
+    of phases is bounded by the number of distinct path lengths, which
+    makes it quick on shallow, layered graphs.
+
+    Args:
+        num_nodes (int): The number of rooms.
+        edges (List[Tuple[int, int, int]]): (from, to, capacity) triples.
+        sources (List[int]): The starting room numbers.
+        sinks (List[int]): The escape pod room numbers.
+
+    Returns:
+        int: The value of the maximum flow.
+
+    Examples:
+    >>> dinic(4, [(0, 1, 3), (0, 2, 2), (1, 2, 5), (1, 3, 2), (2, 3, 3)], [0], [3])
+    5
+    """
+    source, sink, first, head, residual, reverse = build_flow_graph(
+        num_nodes, edges, sources, sinks)
+    n = num_nodes + 2
+    flow = 0
+    stats = STATS
+
+    while True:
+        if stats is not None:
+            stats['phase'] += 1
+        level = [-1] * n
+        level[source] = 0
+        queue = deque([source])
+        while queue and level[sink] < 0:
+            v = queue.popleft()
+            for e in range(first[v], first[v + 1]):
+                w = head[e]
+                if level[w] < 0 and residual[e] > 0:
+                    level[w] = level[v] + 1
+                    queue.append(w)
+        if level[sink] < 0:
+            return flow
+
+        current = first[:n]
+        path = []
+        v = source
+        while True:
+            if v == sink:
+                if stats is not None:
+                    stats['augment'] += 1
+                pushed = min(residual[e] for e in path)
+                for e in path:
+                    residual[e] -= pushed
+                    residual[reverse[e]] += pushed
+                flow += pushed
+                # Back up to just before the first arc that saturated.
+                for i, e in enumerate(path):
+                    if residual[e] == 0:
+                        del path[i:]
+                        break
+                v = head[path[-1]] if path else source
+                continue
+
+            e = current[v]
+            end = first[v + 1]
+            while e < end and not (residual[e] > 0
+                                   and level[head[e]] == level[v] + 1):
+                e += 1
+            if stats is not None:
+                stats['arc_scan'] += e - current[v] + (e < end)
+            current[v] = e
+            if e < end:
+                path.append(e)
+                v = head[e]
+            elif v == source:
+                break
+            else:
+                # A dead end for the rest of this phase.
+                if stats is not None:
+                    stats['dead_end'] += 1
+                level[v] = -1
+                v = head[reverse[path.pop()]]
+                current[v] += 1
+
+
+def boykov_kolmogorov(num_nodes, edges, sources, sinks):
+    """
+    Calculates the maximum flow from `sources` to `sinks` with the
+    Boykov-Kolmogorov algorithm.
+
+    Two search trees grow from the source and the sink over unsaturated
+    arcs until they touch, which gives an augmenting path. Rather than
+    being rebuilt from scratch like Dinic's levels, the trees are kept and
+    repaired: nodes cut off by a saturated arc become orphans and either
+    adopt a new parent in the same tree or are freed. This suits graphs
+    with many short paths, such as grids.
+
+    Args:
+        num_nodes (int): The number of rooms.
+        edges (List[Tuple[int, int, int]]): (from, to, capacity) triples.
+        sources (List[int]): The starting room numbers.
+        sinks (List[int]): The escape pod room numbers.
+
+    Returns:
+        int: The value of the maximum flow.
+
+    Examples:
+    >>> boykov_kolmogorov(4, [(0, 1, 3), (0, 2, 2), (1, 2, 5), (1, 3, 2), (2, 3, 3)], [0], [3])
+    5
+    """
+    source, sink, first, head, residual, reverse = build_flow_graph(
+        num_nodes, edges, sources, sinks)
+    n = num_nodes + 2
+    free, source_tree, sink_tree = 0, 1, 2
+    orphan, root = -1, -2
+
+    tree = [free] * n
+    # parent[v]: the unsaturated arc joining v to its tree, pointing away
+    # from the source in the source tree and towards the sink in the sink
+    # tree.
+    parent = [orphan] * n
+    tree[source], tree[sink] = source_tree, sink_tree
+    parent[source] = parent[sink] = root
+    active = deque([source, sink])
+    flow = 0
+    stats = STATS
+
+    def parent_node(v):
+        e = parent[v]
+        return head[reverse[e]] if tree[v] == source_tree else head[e]
+
+    def rooted(v):
+        while parent[v] != root:
+            if parent[v] == orphan:
+                return False
+            v = parent_node(v)
+        return True
+
+    while True:
+        # Grow the trees until they touch at the arc `bridge`, from the
+        # source tree to the sink tree.
+        bridge = None
+        while active and bridge is None:
+            v = active[0]
+            side = tree[v]
+            if side != free:
+                for e in range(first[v], first[v + 1]):
+                    out = e if side == source_tree else reverse[e]
+                    if residual[out] <= 0:
+                        continue
+                    w = head[e]
+                    if tree[w] == free:
+                        tree[w] = side
+                        parent[w] = out
+                        active.append(w)
+                    elif tree[w] != side:
+                        bridge = out
+                        break
+                if stats is not None:
+                    stats['arc_scan'] += e - first[v] + 1 if first[v] < first[v + 1] else 0
+            if bridge is None:
+                active.popleft()
+        if bridge is None:
+            return flow
+
+        path = [bridge]
+        v = head[reverse[bridge]]
+        while v != source:
+            path.append(parent[v])
+            v = head[reverse[parent[v]]]
+        v = head[bridge]
+        while v != sink:
+            path.append(parent[v])
+            v = head[parent[v]]
+        pushed = min(residual[e] for e in path)
+        flow += pushed
+        if stats is not None:
+            stats['augment'] += 1
+
+        orphans = []
+        for e in path:
+            residual[e] -= pushed
+            residual[reverse[e]] += pushed
+            if residual[e] == 0 and e != bridge:
+                u, w = head[reverse[e]], head[e]
+                child = w if tree[u] == tree[w] == source_tree else u
+                if tree[u] == tree[w]:
+                    parent[child] = orphan
+                    orphans.append(child)
+
+        while orphans:
+            v = orphans.pop()
+            side = tree[v]
+            if stats is not None:
+                stats['orphan'] += 1
+            for e in range(first[v], first[v + 1]):
+                w = head[e]
+                into = reverse[e] if side == source_tree else e
+                if tree[w] == side and residual[into] > 0 and rooted(w):
+                    if stats is not None:
+                        stats['adoption'] += 1
+                    parent[v] = into
+                    break
+            else:
+                for e in range(first[v], first[v + 1]):
+                    w = head[e]
+                    if tree[w] != side:
+                        continue
+                    into = reverse[e] if side == source_tree else e
+                    if residual[into] > 0:
+                        active.append(w)
+                    if parent[w] >= 0 and parent_node(w) == v:
+                        parent[w] = orphan
+                        orphans.append(w)
+                tree[v] = free
+                parent[v] = orphan
+
+
+def choose_engine(num_nodes, edges, sources, sinks):
+    """
+    Picks a max-flow engine from the shape of the graph.
+
+      - Dense graphs, with at least `DENSE_DEGREE` corridors per room, are
+        mostly wide, shallow layers: Dinic needs few phases there and its
+        current arcs skip the many saturated corridors.
+      - Sparse graphs where a sink is at most `SHALLOW_DEPTH` corridors from
+        a source have many short paths, which Boykov-Kolmogorov's search
+        trees find without rebuilding anything.
+      - Anything deeper, like long corridor chains and grids, goes to
+        push-relabel, which moves flow locally instead of searching whole
+        paths.
+
+    Only a breadth-first search of at most `SHALLOW_DEPTH` levels is run.
+
+    Examples:
+    >>> choose_engine(4, [(0, 1, 7), (1, 2, 6), (2, 3, 8)], [0], [3])
+    'boykov_kolmogorov'
+    >>> choose_engine(6, [(u, u + 1, 1) for u in range(5)], [0], [5])
+    'push_relabel'
+    """
+    if len(edges) >= DENSE_DEGREE * num_nodes:
+        return 'dinic'
+
+    corridors = [[] for _ in range(num_nodes)]
+    for u, v, c in edges:
+        if c > 0:
+            corridors[u].append(v)
+    targets = set(sinks)
+    seen = set(sources)
+    frontier = list(sources)
+    for _ in range(SHALLOW_DEPTH + 1):
+        if targets.intersection(frontier):
+            return 'boykov_kolmogorov'
+        frontier = [w for v in frontier for w in corridors[v]
+                    if w not in seen and not seen.add(w)]
+    return 'push_relabel'
+
+
+ENGINES = {
+    'push_relabel': push_relabel,
+    'dinic': dinic,
+    'boykov_kolmogorov': boykov_kolmogorov,
+}
+
+
+def dense_solution(sources, sinks, capacity):
+    """
+    Calculates how many bunnies can safely make it to the escape pods at a
+    time at peak using the the push-relabel maximum flow algorithm.
+
+    The original submission, working on the full capacity matrix.
+
+    Args:
+        sources (List[int]):
+            The starting room numbers of the groups of bunnies.
+        sinks (List[int]):
+            The room numbers of the escape pods.
+        capacity (List[List[int]]):
+            How many bunnies can git through at a time in each direction of
+            every corridor in between.
+
+    Returns:
+        int: The total number of bunnies that can get through at each time step.
+
+    Examples:
+    >>> dense_solution([0], [3], [[0, 7, 0, 0], [0, 0, 6, 0], [0, 0, 0, 8], [9, 0, 0, 0]])
+    6
+    """
     num_nodes = len(capacity)
     flow = [[0] * num_nodes for _ in range(num_nodes)]
     height = [0] * num_nodes
     excess_flow = [0] * num_nodes
     visited = [0] * num_nodes
     q = [i for i in range(num_nodes) if i not in sources and i not in sinks]
+    stats = STATS
 
     def push(v, w):
+        if stats is not None:
+            stats['push'] += 1
         flow_to_push = min(excess_flow[v], capacity[v][w] - flow[v][w])
         flow[v][w] += flow_to_push
         flow[w][v] -= flow_to_push
@@ -39,13 +605,19 @@ def solution(sources, sinks, capacity):
         excess_flow[w] += flow_to_push
 
     def relabel(v):
-        min_height = num_nodes
+        if stats is not None:
+            stats['relabel'] += 1
+        # Heights stay below 2 * num_nodes; capping at num_nodes instead
+        # stalls nodes whose only way out is back above a source.
+        min_height = 2 * num_nodes
         for w in range(num_nodes):
             if capacity[v][w] - flow[v][w] > 0:
                 min_height = min(min_height, height[w])
                 height[v] = min_height + 1
 
     def discharge(v):
+        if stats is not None:
+            stats['discharge'] += 1
         while excess_flow[v] > 0:
             if visited[v] < num_nodes:
                 w = visited[v]
@@ -79,4 +651,6 @@ def solution(sources, sinks, capacity):
     return max_flow
 
 
-doctest.testmod()
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,30 @@
+"""Cross-challenge benchmark suite.
+
+Every challenge gets a seeded input generator in `benchmarks.generators`.
+`benchmarks.runner` times each challenge's `solution`, and the engines
+listed in `benchmarks.generators.ENTRY_POINTS`, over growing input sizes.
+It records peak memory and the scaling exponent, and saves or checks JSON
+baselines.
+
+Usage, from the repository root:
+
+    python -m benchmarks [--cases escape-pods ...] [--save | --check]
+"""
+import os
+
+import foobar
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_solution(name):
+    """Imports a challenge's solver module.
+
+    Args:
+        name (str): A case name, which is the solver's `foobar` module name
+            with dashes for underscores.
+
+    Returns:
+        module: The solver module.
+    """
+    return foobar.load(name.replace('-', '_'))
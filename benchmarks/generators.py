@@ -0,0 +1,142 @@
+"""Seeded input generators for every challenge.
+
+Each generator takes an input size and a seed and returns the positional
+arguments for that challenge's `solution`. The same size and seed always
+give the same input.
+"""
+import random
+from string import ascii_lowercase
+
+
+def ciphertext(size, seed=0):
+    """A `size`-character message of lowercase words and punctuation.
+
+    Examples:
+    >>> len(ciphertext(100)[0])
+    100
+    """
+    rng = random.Random(seed)
+    alphabet = ascii_lowercase * 4 + ' ' * 12 + 'ABC.,!?'
+    return (''.join(rng.choice(alphabet) for _ in range(size)),)
+
+
+def digit_list(size, seed=0):
+    """A list of `size` random digits."""
+    rng = random.Random(seed)
+    return ([rng.randint(0, 9) for _ in range(size)],)
+
+
+def flux_queries(size, seed=0, height=30):
+    """`size` random converter labels in a flux tree of the given height."""
+    rng = random.Random(seed)
+    return height, [rng.randint(1, 2 ** height - 1) for _ in range(size)]
+
+
+def access_codes(size, seed=0, max_value=1000):
+    """`size` random access codes, small enough to divide each other often."""
+    rng = random.Random(seed)
+    return ([rng.randint(1, max_value) for _ in range(size)],)
+
+
+def queue(size, seed=0):
+    """A random first worker ID with a line of `size` workers."""
+    rng = random.Random(seed)
+    return rng.randint(0, 2000000000), size
+
+
+def transition_matrix(size, seed=0, absorbing_fraction=0.1, density=0.5,
+                      max_count=9):
+    """A `size`-state transition matrix where every transient state can
+    reach an absorbing one."""
+    rng = random.Random(seed)
+    num_absorbing = max(1, int(size * absorbing_fraction))
+    absorbing = sorted(rng.sample(range(1, size), num_absorbing))
+    m = []
+    for source in range(size):
+        row = [0] * size
+        if source not in absorbing:
+            for destination in range(size):
+                if rng.random() < density:
+                    row[destination] = rng.randint(1, max_count)
+            row[rng.choice(absorbing)] += 1
+        m.append(row)
+    return (m,)
+
+
+def sparse_transitions(size, seed=0, degree=3, reach=20, block=4):
+    """A `size`-state chain for `sparse_solution`, as one dict per state.
+
+    Every transient state has `degree` transitions up to `reach` states
+    ahead and one back into its `block` of states, so cycles stay short.
+
+    Examples:
+    >>> transitions, = sparse_transitions(10)
+    >>> sum(1 for row in transitions if row)
+    9
+    """
+    rng = random.Random(seed)
+    absorbing = sorted(rng.sample(range(1, size), max(1, size // 10)))
+    terminal = set(absorbing)
+    transitions = []
+    for source in range(size):
+        row = {}
+        if source not in terminal:
+            destinations = [rng.randint(source + 1, min(size - 1, source + reach))
+                            for _ in range(degree)] if source < size - 1 else []
+            start = source - source % block
+            if source > start:
+                destinations.append(rng.randint(start, source - 1))
+            destinations.append(rng.choice(absorbing))
+            for destination in destinations:
+                row[destination] = row.get(destination, 0) + rng.randint(1, 9)
+        transitions.append(row)
+    return (transitions,)
+
+
+def trainer_fight(size, seed=0):
+    """A small room with the beam reaching `size` units."""
+    rng = random.Random(seed)
+    width, height = rng.randint(3, 10), rng.randint(3, 10)
+    you = [rng.randint(1, width - 1), rng.randint(1, height - 1)]
+    trainer = you
+    while trainer == you:
+        trainer = [rng.randint(1, width - 1), rng.randint(1, height - 1)]
+    return [width, height], you, trainer, size
+
+
+def escape_pods(size, seed=0, degree=4):
+    """A `size`-room capacity matrix with a few corridors per room leading
+    from the first rooms towards the last ones."""
+    rng = random.Random(seed)
+    ends = max(1, size // 20)
+    capacity = [[0] * size for _ in range(size)]
+    for u in range(size - ends):
+        for _ in range(degree):
+            v = rng.randint(max(ends, u + 1), min(size - 1, u + size // 5 + 1))
+            capacity[u][v] += rng.randint(1, 100)
+    return list(range(ends)), list(range(size - ends, size)), capacity
+
+
+# name: (generator, input sizes), timed against the challenge's `solution`
+# or the entry point given in ENTRY_POINTS.
+CASES = {
+    'lance-janice': (ciphertext, [10 ** 4, 10 ** 5, 10 ** 6]),
+    'coded-messages': (digit_list, [10 ** 3, 10 ** 4, 10 ** 5]),
+    'ion-flux': (flux_queries, [10 ** 3, 10 ** 4, 10 ** 5]),
+    'access-codes': (access_codes, [10 ** 4, 10 ** 5, 3 * 10 ** 5]),
+    'queue-to-do': (queue, [10 ** 4, 10 ** 5, 10 ** 6]),
+    'doomsday-fuel': (transition_matrix, [10, 20, 30]),
+    'doomsday-fuel-bareiss': (transition_matrix, [40, 80, 120]),
+    'doomsday-fuel-modular': (transition_matrix, [60, 120, 240]),
+    'doomsday-fuel-sparse': (sparse_transitions, [200, 400, 800]),
+    'trainer-fight': (trainer_fight, [300, 1000, 3000]),
+    'escape-pods': (escape_pods, [250, 500, 1000]),
+}
+
+# Cases that time another engine of a challenge: name: (challenge, function).
+# `solution` itself is too slow past a few dozen states to exercise these.
+ENTRY_POINTS = {
+    'doomsday-fuel-bareiss': ('doomsday-fuel', 'bareiss_solution'),
+    'doomsday-fuel-modular': ('doomsday-fuel', 'modular_solution'),
+    'doomsday-fuel-sparse': ('doomsday-fuel', 'sparse_solution'),
+}
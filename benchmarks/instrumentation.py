@@ -0,0 +1,242 @@
+"""Opt-in counters and timers for the heavy solvers.
+
+The instrumented solution modules carry a module-level `STATS = None` and
+bump named counters in their hot loops only when it is a dict. Each
+counter sits behind an `if STATS is not None:` guard, or one on a local
+`stats` copy, and is placed per call or per outer step wherever the inner
+loop is too tight to pay even for that check. Switched off, a solver only
+pays for the guards:
+
+  - coded-messages: `digits_tallied` by `largest_multiple_of_three` and
+    `solution_batch`, `removed_digits` dropped by `remove_smallest`, and
+    `combinations` scanned by `brute_force`;
+  - doomsday-fuel: `pivots`, `row_swaps` and `row_operations` in
+    `invert_matrix`;
+  - trainer-fight: `reflections` generated by `getReflections`;
+  - escape-pods: `engine_<name>` for the engine `edge_list_solution`
+    ran; `push`, `relabel`, `discharge`, `gap` and `global_relabel` steps
+    in `push_relabel`; `phase`, `augment`, `arc_scan` and `dead_end` in
+    `dinic`; `augment`, `arc_scan`, `orphan` and `adoption` in
+    `boykov_kolmogorov`; and `push`, `relabel` and `discharge` in
+    `dense_solution`.
+
+`instrument` switches the counters on for the duration of a `with` block
+and wraps the functions in `TIMED` with timers. Timing happens out here
+because the solutions themselves cannot use the time module. On exit every
+function is put back as it was, so a module outside the block costs
+exactly what it did before.
+
+Running this module compares each solver with its guards stripped out,
+with instrumentation off and with it on, to show the cost of being off.
+
+Usage, from the repository root:
+
+    python -m benchmarks.instrumentation [--repeat 5]
+"""
+import argparse
+import imp
+import json
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import foobar
+from benchmarks import load_solution
+from benchmarks.generators import (digit_list, escape_pods, trainer_fight,
+                                   transition_matrix)
+
+# The functions timed by `instrument`, by challenge.
+TIMED = {
+    'coded-messages': ['largest_multiple_of_three', 'solution_batch',
+                       'brute_force'],
+    'doomsday-fuel': ['split_matrix', 'invert_matrix', 'multiply_matrix'],
+    'trainer-fight': ['getReflections'],
+    'escape-pods': ['choose_engine', 'build_flow_graph', 'push_relabel',
+                    'dinic', 'boykov_kolmogorov', 'dense_solution'],
+}
+
+# An `if stats is not None:` guard and the block under it.
+GUARD = re.compile(r'^( *)if (?:stats|STATS) is not None:\n(?:\1 +.*\n)+',
+                   re.MULTILINE)
+
+
+class Stats(object):
+    """The counters and timers collected by one `instrument` block."""
+
+    def __init__(self):
+        self.counters = defaultdict(int)
+        # timers[name]: [calls, seconds]
+        self.timers = defaultdict(lambda: [0, 0.0])
+
+    def as_dict(self):
+        """
+        Examples:
+        >>> stats = Stats()
+        >>> stats.counters['push'] += 2
+        >>> sorted(stats.as_dict().items())
+        [('counters', {'push': 2}), ('timers', {})]
+        """
+        return {
+            'counters': dict(self.counters),
+            'timers': dict((name, {'calls': calls, 'seconds': seconds})
+                           for name, (calls, seconds) in self.timers.items()),
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), sort_keys=True, **kwargs)
+
+
+def timed(name, function, timers):
+    def wrapper(*args, **kwargs):
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timer = timers[name]
+            timer[0] += 1
+            timer[1] += time.time() - start
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+    return wrapper
+
+
+@contextmanager
+def instrument(challenge, module=None):
+    """Collects counters and timers from one challenge's solver.
+
+    Not thread-safe: the counters live on the module while the block runs.
+
+    Args:
+        challenge (str): A key of `TIMED`.
+        module (module, optional): The solution module to instrument, for
+            callers that imported it themselves. Defaults to the one
+            `load_solution` returns.
+
+    Yields:
+        Stats: The counters and timers, filled in as the block runs.
+
+    Examples:
+    >>> solution = load_solution('escape-pods')
+    >>> with instrument('escape-pods') as stats:
+    ...     solution.push_relabel(3, [(0, 1, 4), (1, 2, 5)], [0], [2])
+    4
+    >>> stats.counters['push'], stats.timers['push_relabel'][0]
+    (4, 1)
+    >>> solution.STATS is None
+    True
+    >>> with instrument('escape-pods') as stats:
+    ...     solution.solution([0], [3], [[0, 7, 0, 0], [0, 0, 6, 0], [0, 0, 0, 8], [9, 0, 0, 0]])
+    6
+    >>> sorted(stats.counters.items())
+    [('arc_scan', 14), ('augment', 1), ('engine_boykov_kolmogorov', 1)]
+    """
+    if module is None:
+        module = load_solution(challenge)
+    if module.STATS is not None:
+        raise RuntimeError("%s is already instrumented" % challenge)
+
+    stats = Stats()
+    patched = []
+    for name in TIMED[challenge]:
+        original = getattr(module, name)
+        wrapper = timed(name, original, stats.timers)
+        patched.append((module.__dict__, name, original))
+        setattr(module, name, wrapper)
+        # Engine tables and the like hold their own references.
+        for table in vars(module).values():
+            if isinstance(table, dict):
+                for key, value in table.items():
+                    if value is original:
+                        patched.append((table, key, original))
+                        table[key] = wrapper
+
+    module.STATS = stats.counters
+    try:
+        yield stats
+    finally:
+        module.STATS = None
+        for table, key, original in reversed(patched):
+            table[key] = original
+
+
+def load_bare_solution(challenge):
+    """Loads a fresh copy of a solution with every counter guard removed."""
+    path = foobar.solution_path(challenge.replace('-', '_'))
+    with open(path) as f:
+        source = GUARD.sub('', f.read())
+    module = imp.new_module('bare_' + challenge.replace('-', '_'))
+    module.__file__ = path
+    exec(compile(source, path, 'exec'), module.__dict__)
+    return module
+
+
+def workloads():
+    """Returns, by challenge, a function that sets up a call of the solver
+    on fixed inputs and returns it. Each call takes a few tenths of a
+    second, long enough for timer noise not to swamp the guards."""
+    digit_lists = [digit_list(9, seed)[0] for seed in range(30000)]
+    matrix = transition_matrix(20)[0]
+    fight = trainer_fight(1500)
+    sources, sinks, capacity = escape_pods(1000)
+    edges = [(u, v, c) for u, row in enumerate(capacity)
+             for v, c in enumerate(row) if c]
+    return {
+        'coded-messages': lambda module: lambda: (
+            [module.solution(l) for l in digit_lists],
+            module.solution_batch(digit_lists)),
+        'doomsday-fuel': lambda module: (
+            lambda m: lambda: module.solution(m))([row[:] for row in matrix]),
+        'trainer-fight': lambda module: lambda: module.solution(*fight),
+        'escape-pods': lambda module: lambda: [
+            module.ENGINES[engine](len(capacity), edges, sources, sinks)
+            for engine in sorted(module.ENGINES) for _ in range(8)],
+    }
+
+
+def best_time(setup, module, repeat):
+    best = None
+    for _ in range(repeat):
+        call = setup(module)
+        start = time.time()
+        call()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true',
+                        help='print the collected stats as JSON')
+    args = parser.parse_args()
+
+    print('%16s %10s %10s %10s %10s' % (
+        'challenge', 'bare (s)', 'off (s)', 'overhead', 'on (s)'))
+    collected = {}
+    for challenge, setup in sorted(workloads().items()):
+        bare_module = load_bare_solution(challenge)
+        module = load_solution(challenge)
+        # Alternate the two so that drift in the machine hits both alike.
+        bare = off = float('inf')
+        for _ in range(args.repeat):
+            bare = min(bare, best_time(setup, bare_module, 1))
+            off = min(off, best_time(setup, module, 1))
+        with instrument(challenge) as stats:
+            on = best_time(setup, module, 1)
+        collected[challenge] = stats.as_dict()
+        print('%16s %10.4f %10.4f %9.1f%% %10.4f' % (
+            challenge, bare, off, 100 * (off / bare - 1), on))
+
+    if args.json:
+        print(json.dumps(collected, indent=2, sort_keys=True))
+    else:
+        for challenge in sorted(collected):
+            print('%s: %s' % (challenge, ', '.join(
+                '%s=%d' % item
+                for item in sorted(collected[challenge]['counters'].items()))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""Load generator for the `foobar.server` JSON-lines service.
+
+Opens `--connections` client connections, each on its own thread, and
+keeps `--depth` requests in flight on each until `--requests` have been
+answered in total. Requests cycle through the chosen solvers with small
+seeded inputs from `benchmarks.generators`. Reports requests per second
+and p50/p99 latency, overall and per solver.
+
+Usage, from the repository root, with a server already running:
+
+    python -m benchmarks.loadgen [--port 8642 | --unix PATH] [--connections 8]
+"""
+import argparse
+import itertools
+import json
+import socket
+import threading
+import time
+
+import foobar
+from benchmarks.generators import CASES
+
+# Input size per solver: small, so latency reflects the service, not the
+# solver's worst case.
+SIZES = {
+    'lance-janice': 200,
+    'coded-messages': 9,
+    'ion-flux': 5,
+    'access-codes': 200,
+    'queue-to-do': 100,
+    'doomsday-fuel': 10,
+    'trainer-fight': 100,
+    'escape-pods': 40,
+}
+
+# Distinct inputs per solver, so batches hold a mix of requests.
+SEEDS = 8
+
+
+def sample_requests(solvers):
+    """Returns the (solver, args) requests to cycle through.
+
+    Examples:
+    >>> sample_requests(['queue_to_do'])[0]
+    ('queue_to_do', [1688843703, 100])
+    """
+    requests = []
+    for seed in range(SEEDS):
+        for name in solvers:
+            case = name.replace('_', '-')
+            generator, _ = CASES[case]
+            requests.append((name, list(generator(SIZES[case], seed))))
+    return requests
+
+
+def percentile(values, p):
+    """The `p`th percentile of sorted `values`, by the nearest rank.
+
+    Examples:
+    >>> percentile(range(1, 101), 99)
+    99
+    >>> percentile([5], 50)
+    5
+    """
+    rank = max(1, int(-(-len(values) * p // 100)))
+    return values[rank - 1]
+
+
+def client(address, requests, count, depth, latencies, errors):
+    """Sends `count` requests over one connection, `depth` at a time.
+
+    Appends (solver, seconds) to `latencies` and (solver, message) to
+    `errors` as answers arrive.
+    """
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.connect(address)
+    replies = sock.makefile('rb')
+    sent = {}
+    ids = itertools.count()
+    cycle = itertools.cycle(requests)
+
+    def send():
+        request_id = next(ids)
+        name, args = next(cycle)
+        sent[request_id] = (name, time.time())
+        sock.sendall(json.dumps(
+            {'id': request_id, 'solver': name, 'args': args}) + '\n')
+
+    try:
+        for _ in range(min(depth, count)):
+            send()
+        answered = 0
+        while answered < count:
+            line = replies.readline()
+            if not line:
+                raise IOError('Server closed the connection')
+            reply = json.loads(line)
+            name, start = sent.pop(reply['id'])
+            latencies.append((name, time.time() - start))
+            if 'error' in reply:
+                errors.append((name, reply['error']))
+            answered += 1
+            if answered + len(sent) < count:
+                send()
+    finally:
+        replies.close()
+        sock.close()
+
+
+def report(label, seconds, elapsed, errors):
+    seconds = sorted(seconds)
+    print('%16s %8d %10.1f %10.2f %10.2f %8d' % (
+        label, len(seconds), len(seconds) / elapsed,
+        1000 * percentile(seconds, 50), 1000 * percentile(seconds, 99), errors))
+
+
+def main():
+    solvers = foobar.SOLVERS
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8642)
+    parser.add_argument('--unix', help='connect to this Unix socket path instead')
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--depth', type=int, default=4,
+                        help='requests in flight per connection')
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--solvers', nargs='+', default=solvers, choices=solvers)
+    args = parser.parse_args()
+
+    address = args.unix or (args.host, args.port)
+    requests = sample_requests(args.solvers)
+    latencies, errors = [], []
+    share, extra = divmod(args.requests, args.connections)
+    threads = [
+        threading.Thread(target=client, args=(
+            address, requests, share + (i < extra), args.depth, latencies, errors))
+        for i in range(args.connections)]
+
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+
+    print('%16s %8s %10s %10s %10s %8s' % (
+        'solver', 'requests', 'req/s', 'p50 (ms)', 'p99 (ms)', 'errors'))
+    for name in args.solvers:
+        seconds = [s for n, s in latencies if n == name]
+        if seconds:
+            report(name, seconds, elapsed, sum(1 for n, _ in errors if n == name))
+    if latencies:
+        report('all', [s for _, s in latencies], elapsed, len(errors))
+    for name, message in errors[:10]:
+        print('%s: %s' % (name, message))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""Runs the cross-challenge benchmarks and checks them against a baseline.
+
+Each (challenge, size) pair runs in a fresh worker process, so peak memory
+readings stay apart. A run calls the solver on fresh inputs until at least
+`MIN_RUN_SECONDS` have passed, so quick cases get many calls. The time kept
+is that of the fastest call over `--repeat` runs, since noise only ever
+adds time, and the peak memory is the growth of the worker's peak resident set over the
+inputs themselves. The scaling exponent `k` is the least-squares slope of
+log(time) against log(size), so time grows roughly like size ** k.
+
+`--save` writes the results to a JSON baseline. `--check` compares them to
+the baseline instead and exits with an error listing every time or memory
+reading more than `--tolerance` above it. Times must also be at least
+`TIME_FLOOR_SECONDS` above the baseline, and peaks at least
+`MEMORY_FLOOR_KB` in size, since smaller differences are timer and
+allocator noise. Cases that look slower are run once more and only
+reported if the better of the two runs is still slower, since a busy
+machine can slow one run by more than the tolerance.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import sys
+import time
+from multiprocessing import Pool
+
+from benchmarks import ROOT, load_solution
+from benchmarks.generators import CASES, ENTRY_POINTS
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+# Peak memory readings below this many KB are too coarse to compare.
+MEMORY_FLOOR_KB = 1024
+# Slowdowns of fewer seconds than this are noise, however large in percent.
+TIME_FLOOR_SECONDS = 0.002
+# Each timed run repeats the solver call until this much time has passed.
+MIN_RUN_SECONDS = 1.0
+
+
+def measure(job):
+    """Times one challenge at one input size, in a worker process.
+
+    Returns:
+        Tuple[float, int]: The fastest call in seconds, and the peak
+            resident memory in KB above that of the inputs.
+    """
+    name, size, repeat = job
+    challenge, entry_point = ENTRY_POINTS.get(name, (name, 'solution'))
+    solve = getattr(load_solution(challenge), entry_point)
+    generator, _ = CASES[name]
+    best = None
+    peak = 0
+    for _ in range(repeat):
+        total = 0.0
+        while total < MIN_RUN_SECONDS:
+            # Solutions may modify their inputs, so every call gets fresh ones.
+            args = generator(size)
+            baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            start = time.time()
+            solve(*args)
+            elapsed = time.time() - start
+            peak = max(peak, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline)
+            best = elapsed if best is None else min(best, elapsed)
+            total += elapsed
+    return best, peak
+
+
+def scaling_exponent(sizes, seconds):
+    """Fits time = c * size ** k by least squares on a log-log scale.
+
+    Examples:
+    >>> round(scaling_exponent([10, 100, 1000], [0.01, 1, 100]), 6)
+    2.0
+    """
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(elapsed, 1e-9)) for elapsed in seconds]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def run_case(name, repeat=3):
+    """Benchmarks one challenge over all of its input sizes.
+
+    Returns:
+        Dict[str, Any]: The sizes, the best seconds and the peak KB per
+            size, and the scaling exponent.
+    """
+    _, sizes = CASES[name]
+    seconds, peaks = [], []
+    for size in sizes:
+        pool = Pool(1, maxtasksperchild=1)
+        try:
+            elapsed, peak = pool.apply(measure, ((name, size, repeat),))
+        finally:
+            pool.close()
+            pool.join()
+        seconds.append(elapsed)
+        peaks.append(peak)
+    return {
+        'sizes': sizes,
+        'seconds': seconds,
+        'peak_kb': peaks,
+        'exponent': scaling_exponent(sizes, seconds),
+    }
+
+
+def regressions(results, baseline, tolerance=0.1):
+    """Lists every reading more than `tolerance` above its baseline.
+
+    Times within `TIME_FLOOR_SECONDS` of the baseline, and peaks below
+    `MEMORY_FLOOR_KB`, are never regressions. Cases or sizes missing from
+    either side are skipped.
+
+    Examples:
+    >>> old = {'queue-to-do': {'sizes': [10], 'seconds': [1.0], 'peak_kb': [0]}}
+    >>> new = {'queue-to-do': {'sizes': [10], 'seconds': [1.5], 'peak_kb': [0]}}
+    >>> regressions(new, old)
+    ['queue-to-do at size 10: 1.5000s is 50% slower than 1.0000s']
+    >>> regressions(old, new)
+    []
+    >>> quick = {'queue-to-do': {'sizes': [10], 'seconds': [0.0015], 'peak_kb': [0]}}
+    >>> regressions(quick, {'queue-to-do': {'sizes': [10], 'seconds': [0.001], 'peak_kb': [0]}})
+    []
+    """
+    found = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        new = results[name]
+        for size, seconds, peak in zip(new['sizes'], new['seconds'], new['peak_kb']):
+            if size not in old['sizes']:
+                continue
+            i = old['sizes'].index(size)
+            old_seconds, old_peak = old['seconds'][i], old['peak_kb'][i]
+            if (seconds > old_seconds * (1 + tolerance)
+                    and seconds - old_seconds >= TIME_FLOOR_SECONDS):
+                found.append('%s at size %d: %.4fs is %d%% slower than %.4fs' % (
+                    name, size, seconds, round(100 * (seconds / old_seconds - 1)),
+                    old_seconds))
+            if old_peak >= MEMORY_FLOOR_KB and peak > old_peak * (1 + tolerance):
+                found.append('%s at size %d: %d KB is %d%% more than %d KB' % (
+                    name, size, peak, round(100 * (float(peak) / old_peak - 1)),
+                    old_peak))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cases', nargs='+', default=sorted(CASES),
+                        choices=sorted(CASES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument('--save', action='store_true',
+                        help='write the results to the baseline')
+    action.add_argument('--check', action='store_true',
+                        help='fail if the results regress from the baseline')
+    args = parser.parse_args()
+    if args.check and not os.path.exists(args.baseline):
+        sys.exit('No baseline at %s: record one with --save first.' % args.baseline)
+
+    results = {}
+    print('%22s %10s %12s %12s %10s' % (
+        'challenge', 'size', 'time (s)', 'peak (KB)', 'exponent'))
+    for name in args.cases:
+        result = results[name] = run_case(name, args.repeat)
+        for i, size in enumerate(result['sizes']):
+            print('%22s %10d %12.4f %12d %10s' % (
+                name, size, result['seconds'][i], result['peak_kb'][i],
+                '%.2f' % result['exponent'] if i == len(result['sizes']) - 1 else ''))
+
+    if args.save:
+        cases = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                cases = json.load(f)['cases']
+        cases.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'python': platform.python_version(), 'cases': cases},
+                      f, indent=2, sort_keys=True)
+        print('Saved baseline to %s' % args.baseline)
+    elif args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['cases']
+        suspects = [name for name in args.cases
+                    if regressions({name: results[name]}, baseline, args.tolerance)]
+        for name in suspects:
+            print('Confirming %s' % name)
+            rerun = run_case(name, args.repeat)
+            result = results[name]
+            result['seconds'] = [min(a, b) for a, b in zip(result['seconds'], rerun['seconds'])]
+            result['peak_kb'] = [min(a, b) for a, b in zip(result['peak_kb'], rerun['peak_kb'])]
+        found = regressions(results, baseline, args.tolerance)
+        if found:
+            sys.exit('Performance regressions against %s:\n  %s' % (
+                args.baseline, '\n  '.join(found)))
+        print('No regressions against %s' % args.baseline)
@@ -0,0 +1,84 @@
+"""Importable Google Foobar solvers.
+
+Each challenge's solution.py stays a standalone file, as submitted, in a
+directory whose name is not a valid module name. This package gives each
+one a stable module name instead:
+
+    foobar.lance_janice      1-i-love-lance-janice
+    foobar.coded_messages    2.1-please-pass-the-coded-messages
+    foobar.ion_flux          2.2-ion-flux-relabeling
+    foobar.access_codes      3.1-find-the-access-codes
+    foobar.queue_to_do       3.2-queue-to-do
+    foobar.doomsday_fuel     3.3-doomsday-fuel
+    foobar.trainer_fight     4.1-bringing-a-gun-to-a-trainer-fight
+    foobar.escape_pods       4.2-escape-pods
+
+Importing `foobar` loads none of them; each submodule runs its
+solution.py only when it is first imported. Nothing is tested on import:
+the doctests and self-checks run with `python -m foobar.tests`.
+
+Examples:
+>>> from foobar import escape_pods
+>>> escape_pods.solution([0], [3], [[0, 7, 0, 0], [0, 0, 6, 0], [0, 0, 0, 8], [9, 0, 0, 0]])
+6
+>>> solver('queue_to_do')(17, 4)
+14
+"""
+import importlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The challenge directory behind each solver module.
+CHALLENGES = {
+    'lance_janice': '1-i-love-lance-janice',
+    'coded_messages': '2.1-please-pass-the-coded-messages',
+    'ion_flux': '2.2-ion-flux-relabeling',
+    'access_codes': '3.1-find-the-access-codes',
+    'queue_to_do': '3.2-queue-to-do',
+    'doomsday_fuel': '3.3-doomsday-fuel',
+    'trainer_fight': '4.1-bringing-a-gun-to-a-trainer-fight',
+    'escape_pods': '4.2-escape-pods',
+}
+
+SOLVERS = sorted(CHALLENGES)
+
+
+def solution_path(name):
+    """Returns the path of a solver's solution.py."""
+    return os.path.join(ROOT, CHALLENGES[name], 'solution.py')
+
+
+def load(name):
+    """Imports the solver module `foobar.<name>`.
+
+    Args:
+        name (str): One of `SOLVERS`.
+
+    Returns:
+        module: The solver module.
+    """
+    if name not in CHALLENGES:
+        raise ValueError("Unknown solver %r" % name)
+    return importlib.import_module('%s.%s' % (__name__, name))
+
+
+def solver(name):
+    """Returns a solver's `solution` function."""
+    return load(name).solution
+
+
+def load_solution_source(module_name):
+    """Runs a challenge's solution.py in the namespace of its solver module.
+
+    Called by each solver module as it is imported. The module reports the
+    solution.py path as its `__file__`, so tracebacks, doctests and
+    `inspect` all point at the real source.
+    """
+    module = sys.modules[module_name]
+    path = solution_path(module_name.rpartition('.')[2])
+    with open(path) as f:
+        code = compile(f.read(), path, 'exec')
+    module.__file__ = path
+    exec(code, module.__dict__)
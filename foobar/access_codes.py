@@ -0,0 +1,7 @@
+"""Find the Access Codes, challenge 3.1: counting lucky triples.
+
+Runs 3.1-find-the-access-codes/solution.py in this module's namespace.
+"""
+from foobar import load_solution_source
+
+load_solution_source(__name__)
@@ -0,0 +1,7 @@
+"""Please Pass the Coded Messages, challenge 2.1: the largest multiple of 3.
+
+Runs 2.1-please-pass-the-coded-messages/solution.py in this module's namespace.
+"""
+from foobar import load_solution_source
+
+load_solution_source(__name__)
@@ -0,0 +1,7 @@
+"""Doomsday Fuel, challenge 3.3: absorbing Markov chain probabilities.
+
+Runs 3.3-doomsday-fuel/solution.py in this module's namespace.
+"""
+from foobar import load_solution_source
+
+load_solution_source(__name__)
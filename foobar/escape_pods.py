@@ -0,0 +1,7 @@
+"""Escape Pods, challenge 4.2: maximum flow from bunnies to pods.
+
+Runs 4.2-escape-pods/solution.py in this module's namespace.
+"""
+from foobar import load_solution_source
+
+load_solution_source(__name__)
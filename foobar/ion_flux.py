@@ -0,0 +1,7 @@
+"""Ion Flux Relabeling, challenge 2.2: parents in a post-order labelled tree.
+
+Runs 2.2-ion-flux-relabeling/solution.py in this module's namespace.
+"""
+from foobar import load_solution_source
+
+load_solution_source(__name__)
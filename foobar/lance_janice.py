@@ -0,0 +1,7 @@
+"""I Love Lance & Janet, challenge 1: Atbash decoding of Lambda's messages.
+
+Runs 1-i-love-lance-janice/solution.py in this module's namespace.
+"""
+from foobar import load_solution_source
+
+load_solution_source(__name__)
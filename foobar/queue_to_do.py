@@ -0,0 +1,7 @@
+"""Queue To Do, challenge 3.2: XOR checksums of a shrinking queue.
+
+Runs 3.2-queue-to-do/solution.py in this module's namespace.
+"""
+from foobar import load_solution_source
+
+load_solution_source(__name__)
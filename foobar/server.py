@@ -0,0 +1,321 @@
+"""JSON-lines service in front of every solver.
+
+Listens on a TCP or Unix socket. Each request is one line of JSON naming a
+solver from `foobar.SOLVERS` and the arguments of its `solution`:
+
+    {"id": 7, "solver": "queue_to_do", "args": [17, 4]}
+
+and gets one line back, in completion order rather than request order:
+
+    {"id": 7, "result": 14}
+    {"id": 8, "error": "ValueError: Unknown solver 'queue'"}
+
+One thread runs an asyncore event loop, since Python 2 has no asyncio.
+Requests for the same solver that arrive within `batch_window` seconds of
+the first are answered together, up to `max_batch` at a time. Solvers
+with a `solution_batch` get the whole batch in a single call. Batches for
+the CPU-heavy solvers in `POOLED` go to a process pool, so the loop keeps
+serving while they run. The rest are answered inline, which is quick for
+inputs within their challenge's limits; a request far outside them holds
+up every connection until it is answered.
+
+At most `max_pending` requests are held at once. Beyond that the server
+stops reading from its connections until answers go out, so the backlog
+waits in socket buffers and clients slow down instead of the server
+growing without bound.
+
+Usage, from the repository root:
+
+    python -m foobar.server [--port 8642 | --unix PATH] [--processes N]
+"""
+import argparse
+import asynchat
+import asyncore
+import json
+import os
+import socket
+import time
+from collections import deque
+from multiprocessing import Pool, cpu_count
+
+import foobar
+
+# Solvers whose batches run in the process pool: those whose time grows
+# fast enough with their input to stall the event loop.
+POOLED = frozenset(['access_codes', 'doomsday_fuel', 'escape_pods', 'trainer_fight'])
+
+# Solvers with a `solution_batch`, and how each request's arguments become
+# one item of its batch.
+BATCHED = {
+    'coded_messages': lambda args: args[0],
+    'queue_to_do': tuple,
+}
+
+
+def run_batch(name, calls):
+    """Answers a batch of calls to one solver.
+
+    Args:
+        name (str): One of `foobar.SOLVERS`.
+        calls (List[List[Any]]): The arguments of each `solution` call.
+
+    Returns:
+        List[Tuple[bool, Any]]: For each call, whether it succeeded, and its
+            result or error message. Never raises, since a batch that fails
+            in the pool would otherwise go unanswered.
+
+    Examples:
+    >>> run_batch('queue_to_do', [[0, 3], [17, 4]])
+    [(True, 2), (True, 14)]
+    >>> run_batch('ion_flux', [[3, [7, 3]], [3]])
+    [(True, [-1, 7]), (False, 'TypeError: solution() takes exactly 2 arguments (1 given)')]
+    >>> run_batch('queue', [[17, 4]])
+    [(False, "ValueError: Unknown solver 'queue'")]
+    """
+    try:
+        module = foobar.load(name)
+    except Exception as e:
+        return [(False, '%s: %s' % (type(e).__name__, e))] * len(calls)
+
+    if name in BATCHED:
+        try:
+            items = [BATCHED[name](args) for args in calls]
+            results = [(True, result) for result in module.solution_batch(items)]
+            if len(results) == len(calls):
+                return results
+        except Exception:
+            pass
+        # Answer one call at a time below, so only the bad ones fail.
+
+    results = []
+    for args in calls:
+        try:
+            results.append((True, module.solution(*args)))
+        except Exception as e:
+            results.append((False, '%s: %s' % (type(e).__name__, e)))
+    return results
+
+
+class Connection(asynchat.async_chat):
+    """One client connection, reading requests a line at a time."""
+
+    def __init__(self, sock, server):
+        asynchat.async_chat.__init__(self, sock, map=server.map)
+        self.server = server
+        self.incoming = []
+        self.set_terminator('\n')
+
+    def readable(self):
+        return (self.server.pending < self.server.max_pending
+                and asynchat.async_chat.readable(self))
+
+    def collect_incoming_data(self, data):
+        self.incoming.append(data)
+
+    def found_terminator(self):
+        line = ''.join(self.incoming)
+        self.incoming = []
+        if line.strip():
+            self.server.submit(self, line)
+
+    def respond(self, message):
+        if not self.connected:
+            return
+        try:
+            line = json.dumps(message)
+        except (TypeError, ValueError) as e:
+            line = json.dumps({'id': message.get('id'), 'error': '%s: %s' % (
+                type(e).__name__, e)})
+        self.push(line + '\n')
+
+
+class Waker(asyncore.file_dispatcher):
+    """Wakes the event loop when the pool finishes a batch."""
+
+    def __init__(self, fd, server):
+        asyncore.file_dispatcher.__init__(self, fd, map=server.map)
+        self.server = server
+
+    def writable(self):
+        return False
+
+    def handle_read(self):
+        self.recv(4096)
+        self.server.deliver()
+
+
+class Server(asyncore.dispatcher):
+    """Batches solver requests from many connections.
+
+    Examples:
+    >>> import socket
+    >>> server = Server(('127.0.0.1', 0), processes=0)
+    >>> client = socket.create_connection(server.address)
+    >>> client.sendall('{"id": 1, "solver": "queue_to_do", "args": [17, 4]}\\n')
+    >>> while not server.pending:
+    ...     server.poll()
+    >>> while server.pending:
+    ...     server.poll()
+    >>> server.poll()
+    >>> client.recv(4096)
+    '{"id": 1, "result": 14}\\n'
+    >>> client.close()
+    >>> server.close()
+    """
+
+    def __init__(self, address, processes=None, batch_window=0.002,
+                 max_batch=64, max_pending=1024):
+        """
+        Args:
+            address (Union[Tuple[str, int], str]): A (host, port) to listen
+                on over TCP, or a path for a Unix socket.
+            processes (int, optional): The pool size for `POOLED` solvers.
+                0 runs them inline. Defaults to the number of CPUs.
+            batch_window (float, optional): How long the first request of a
+                batch waits for others, in seconds. Defaults to 0.002.
+            max_batch (int, optional): The most requests in one batch.
+                Defaults to 64.
+            max_pending (int, optional): The most requests held before the
+                server stops reading. Defaults to 1024.
+        """
+        self.map = {}
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.pending = 0
+        # queues[solver]: the (connection, id, args) of requests not yet
+        # sent off, and deadlines[solver] when they must be.
+        self.queues = {}
+        self.deadlines = {}
+        # Batches the pool has answered, waiting for the event loop.
+        self.finished = deque()
+
+        if processes is None:
+            processes = cpu_count()
+        # Started before the sockets exist, so workers do not inherit them.
+        self.pool = Pool(processes) if processes else None
+
+        asyncore.dispatcher.__init__(self, map=self.map)
+        unix = not isinstance(address, tuple)
+        self.create_socket(socket.AF_UNIX if unix else socket.AF_INET,
+                           socket.SOCK_STREAM)
+        if not unix:
+            self.set_reuse_addr()
+        self.bind(address)
+        self.listen(128)
+        self.address = self.socket.getsockname()
+
+        read_fd, self.wake_fd = os.pipe()
+        Waker(read_fd, self)
+
+    def handle_accept(self):
+        pair = self.accept()
+        if pair is not None:
+            Connection(pair[0], self)
+
+    def submit(self, connection, line):
+        """Queues one request line from `connection`."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            name = request['solver']
+            args = request.get('args', [])
+            if name not in foobar.CHALLENGES:
+                raise ValueError('Unknown solver %r' % name)
+            if not isinstance(args, list):
+                raise ValueError('args must be a list')
+        except (AttributeError, KeyError, ValueError) as e:
+            connection.respond({'id': request_id, 'error': '%s: %s' % (
+                type(e).__name__, e)})
+            return
+
+        self.pending += 1
+        queue = self.queues.setdefault(name, [])
+        queue.append((connection, request_id, args))
+        if len(queue) >= self.max_batch:
+            self.flush(name)
+        elif name not in self.deadlines:
+            self.deadlines[name] = time.time() + self.batch_window
+
+    def flush(self, name):
+        """Sends off the queued requests for one solver."""
+        batch = self.queues.pop(name, [])
+        self.deadlines.pop(name, None)
+        if not batch:
+            return
+        calls = [args for _, _, args in batch]
+        if self.pool is not None and name in POOLED:
+            self.pool.apply_async(run_batch, (name, calls),
+                                  callback=lambda results: self.finish(batch, results))
+        else:
+            self.answer(batch, run_batch(name, calls))
+
+    def finish(self, batch, results):
+        # Runs on the pool's result thread, so only hand over and wake up.
+        self.finished.append((batch, results))
+        os.write(self.wake_fd, 'x')
+
+    def deliver(self):
+        while self.finished:
+            self.answer(*self.finished.popleft())
+
+    def answer(self, batch, results):
+        try:
+            for (connection, request_id, _), (ok, value) in zip(batch, results):
+                connection.respond({'id': request_id, 'result' if ok else 'error': value})
+        finally:
+            self.pending -= len(batch)
+
+    def poll(self):
+        """Runs one round of the event loop and flushes due batches."""
+        timeout = 1.0
+        if self.deadlines:
+            timeout = max(0, min(self.deadlines.values()) - time.time())
+        asyncore.loop(timeout=timeout, map=self.map, count=1)
+        now = time.time()
+        for name, deadline in list(self.deadlines.items()):
+            if deadline <= now:
+                self.flush(name)
+
+    def serve_forever(self):
+        while True:
+            self.poll()
+
+    def close(self):
+        asyncore.dispatcher.close(self)
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+        for dispatcher in list(self.map.values()):
+            dispatcher.close()
+        os.close(self.wake_fd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8642)
+    parser.add_argument('--unix', help='listen on this Unix socket path instead')
+    parser.add_argument('--processes', type=int, default=cpu_count())
+    parser.add_argument('--batch-window', type=float, default=0.002)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-pending', type=int, default=1024)
+    args = parser.parse_args()
+
+    address = args.unix or (args.host, args.port)
+    server = Server(address, args.processes, args.batch_window,
+                    args.max_batch, args.max_pending)
+    print('Serving %s on %s' % (', '.join(foobar.SOLVERS), server.address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if args.unix:
+            os.remove(args.unix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Cold-start cost for a worker that needs only one solver.
+
+For every solver, times fresh interpreters that:
+
+  - do nothing, to measure the interpreter's own start-up, which is
+    subtracted from the other two;
+  - `import foobar.<name>`, loading that one solver and nothing else;
+  - run the solver's solution.py the way importing it used to, doctests
+    and self-checks included.
+
+Each figure is the best of `--repeat` runs. `--importtime NAME` instead
+prints a breakdown of `import foobar.NAME` in the format of
+`python -X importtime`, emulated on interpreters without it.
+
+Usage, from the repository root:
+
+    python -m foobar.startup [--repeat 5] [--importtime escape_pods]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from foobar import ROOT, SOLVERS, solution_path
+
+# Times every first import below `import foobar.<name>` and prints them to
+# stderr in the `-X importtime` format, children before their parents.
+IMPORTTIME = '''
+import sys, time
+try:
+    import builtins
+except ImportError:
+    import __builtin__ as builtins
+original = builtins.__import__
+nested = []
+rows = []
+
+def timed_import(name, *args, **kwargs):
+    if name in sys.modules:
+        return original(name, *args, **kwargs)
+    nested.append(0.0)
+    start = time.time()
+    try:
+        return original(name, *args, **kwargs)
+    finally:
+        elapsed = time.time() - start
+        children = nested.pop()
+        if nested:
+            nested[-1] += elapsed
+        rows.append((elapsed - children, elapsed, len(nested), name))
+
+builtins.__import__ = timed_import
+import foobar.%s
+builtins.__import__ = original
+sys.stderr.write('import time: self [us] | cumulative | imported package\\n')
+for own, cumulative, depth, name in rows:
+    if name:
+        sys.stderr.write('import time: %%9d | %%10d | %%s%%s\\n' %% (
+            own * 1e6, cumulative * 1e6, '  ' * depth, name))
+'''
+
+
+def best_run(command, repeat):
+    """Returns the best wall time of running `command` from the root."""
+    best = None
+    with open(os.devnull, 'w') as devnull:
+        for _ in range(repeat):
+            start = time.time()
+            subprocess.check_call(command, cwd=ROOT, stdout=devnull)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--solvers', nargs='+', default=SOLVERS, choices=SOLVERS)
+    parser.add_argument('--importtime', choices=SOLVERS,
+                        help='print an import time breakdown for one solver')
+    args = parser.parse_args()
+
+    if args.importtime:
+        subprocess.check_call(
+            [sys.executable, '-c', IMPORTTIME % args.importtime], cwd=ROOT)
+        return
+
+    interpreter = best_run([sys.executable, '-c', 'pass'], args.repeat)
+    print('interpreter start-up: %.1f ms' % (1000 * interpreter))
+    print('%16s %12s %18s' % ('solver', 'import (ms)', 'with tests (ms)'))
+    for name in args.solvers:
+        lazy = best_run([sys.executable, '-c', 'import foobar.' + name],
+                        args.repeat)
+        tested = best_run([sys.executable, solution_path(name)], args.repeat)
+        print('%16s %12.1f %18.1f' % (
+            name, 1000 * (lazy - interpreter), 1000 * (tested - interpreter)))
+
+
+if __name__ == '__main__':
+    main()
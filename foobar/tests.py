@@ -0,0 +1,128 @@
+"""Runs every solver's doctests and self-checks.
+
+Solution modules no longer test themselves on import, so this is the one
+place their tests run from, along with the checks that compare the fast
+engines against the original solutions on random inputs. The doctests of
+the helper modules next to each solution.py, such as bulk.py or
+network.py, run with their solver, and those of the `foobar` and
+`benchmarks` packages run last.
+
+Usage, from the repository root:
+
+    python -m foobar.tests [--solvers escape_pods ...] [--skip-packages] [-v]
+"""
+import argparse
+import doctest
+import glob
+import imp
+import importlib
+import os
+import sys
+import time
+
+from foobar import CHALLENGES, ROOT, SOLVERS, load
+
+# Package modules whose doctests run after the solvers'.
+PACKAGE_MODULES = [
+    'foobar', 'foobar.server', 'foobar.startup', 'foobar.tests',
+    'benchmarks', 'benchmarks.generators', 'benchmarks.instrumentation',
+    'benchmarks.loadgen', 'benchmarks.runner',
+]
+
+# Self-check functions to call, by solver, besides the doctests.
+CHECKS = {
+    'coded_messages': ['test_largest_multiple_of_three'],
+    'queue_to_do': ['test_closedFormChecksum'],
+    'doomsday_fuel': ['test_solution'],
+}
+
+
+def load_helpers(name):
+    """Imports the helper modules beside a solver's solution.py.
+
+    Helpers import their solver as `solution`, so that name is pointed at
+    the solver module while they load. Each is registered under a name of
+    its own, so process pools can find its functions.
+
+    Returns:
+        List[module]: The helper modules, by file name.
+    """
+    module = load(name)
+    directory = os.path.join(ROOT, CHALLENGES[name])
+    previous = sys.modules.get('solution')
+    sys.modules['solution'] = module
+    sys.path.insert(0, directory)
+    try:
+        return [imp.load_source('%s_%s' % (name, os.path.basename(path)[:-3]), path)
+                for path in sorted(glob.glob(os.path.join(directory, '*.py')))
+                if os.path.basename(path) != 'solution.py']
+    finally:
+        sys.path.remove(directory)
+        if previous is None:
+            del sys.modules['solution']
+        else:
+            sys.modules['solution'] = previous
+
+
+def run(name, verbose=False):
+    """Runs one solver's doctests and self-checks, and its helpers' doctests.
+
+    Returns:
+        Tuple[int, int]: The number of failures and of tests run.
+    """
+    module = load(name)
+    failed, attempted = doctest.testmod(module, verbose=verbose)
+    for check in CHECKS.get(name, []):
+        attempted += 1
+        try:
+            getattr(module, check)()
+        except AssertionError as e:
+            failed += 1
+            print('%s.%s failed: %s' % (name, check, e))
+    for helper in load_helpers(name):
+        result = doctest.testmod(helper, verbose=verbose)
+        failed += result[0]
+        attempted += result[1]
+    return failed, attempted
+
+
+def run_packages(verbose=False):
+    """Runs the doctests of `PACKAGE_MODULES`.
+
+    Returns:
+        Tuple[int, int]: The number of failures and of tests run.
+    """
+    failed = attempted = 0
+    for name in PACKAGE_MODULES:
+        result = doctest.testmod(importlib.import_module(name), verbose=verbose)
+        failed += result[0]
+        attempted += result[1]
+    return failed, attempted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--solvers', nargs='+', default=SOLVERS, choices=SOLVERS)
+    parser.add_argument('--skip-packages', action='store_true',
+                        help="skip the foobar and benchmarks packages' doctests")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    suites = [(name, lambda name=name: run(name, args.verbose))
+              for name in args.solvers]
+    if not args.skip_packages:
+        suites.append(('packages', lambda: run_packages(args.verbose)))
+
+    total_failed = 0
+    for name, suite in suites:
+        start = time.time()
+        failed, attempted = suite()
+        total_failed += failed
+        print('%-16s %4d tests %4d failed %8.2fs' % (
+            name, attempted, failed, time.time() - start))
+    if total_failed:
+        sys.exit('%d test(s) failed' % total_failed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""Bringing a Gun to a Trainer Fight, challenge 4.1: beams in a mirrored room.
+
+Runs 4.1-bringing-a-gun-to-a-trainer-fight/solution.py in this module's namespace.
+"""
+from foobar import load_solution_source
+
+load_solution_source(__name__)